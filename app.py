@@ -1,49 +1,154 @@
 import os
-import json
+import click
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, redirect, url_for, session, flash, make_response, jsonify
+from flask import Flask, current_app, g, render_template, request, redirect, url_for, session, flash, make_response, jsonify, send_from_directory
+from flask.cli import with_appcontext
 from flask_wtf.csrf import CSRFProtect
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import update
+from werkzeug.security import check_password_hash
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
 from dotenv import load_dotenv
-from models import db, Content, Feature, Product, ProductImage, Admin, ContentHistory
-
-# Import Cloudinary helper (will work even if Cloudinary not configured)
-try:
-    from cloudinary_helper import upload_image, upload_video, delete_file, is_cloudinary_configured
-except ImportError:
-    # Fallback if cloudinary not installed
-    def upload_image(*args, **kwargs): return None
-    def upload_video(*args, **kwargs): return None
-    def delete_file(*args, **kwargs): return False
-    def is_cloudinary_configured(): return False
-
-# Load environment variables
-load_dotenv()
 
-app = Flask(__name__)
+# Load environment variables before the local imports below: several of
+# them read their settings into module constants at import time
+load_dotenv()
 
-# Security Configuration
-app.secret_key = os.environ.get('SECRET_KEY', os.urandom(32))
-app.config['SESSION_COOKIE_SECURE'] = os.environ.get('SESSION_COOKIE_SECURE', 'False') == 'True'
-app.config['SESSION_COOKIE_HTTPONLY'] = True
-app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
-app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=1)
-app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 20 * 1024 * 1024))  # 20MB
+from db_engine import engine_options, pool_stats
+from db_routing import recently_written, remember_write, replica_binds
+from models import db, Feature, Product, ProductImage, Admin, ContentHistory
+from page_cache import PageCache
+from route_table import RouteTable
+from content_history import content_state, create_snapshot, delete_entry, diff_snapshot, history_page, load_snapshot
+from chunked_uploads import (CHUNK_SIZE as UPLOAD_CHUNK_SIZE, UploadError, create_upload, discard_upload,
+                             finished_upload, get_upload, write_chunk)
+from gallery_uploads import LocalUploader, upload_gallery
+from media_jobs import enqueue, enqueue_remote_delete, job_status, retry_failed_jobs, run_inline_jobs, run_worker, spool_file, spool_path
+from image_pipeline import backfill as backfill_image_derivatives, responsive_image
+from video_pipeline import VIDEO_MIMETYPES, backfill as backfill_video_variants, hero_video
+from compression import compress_response, precompress_static, send_static_file
+from security_headers import apply_headers, csp_nonce
+from static_assets import IMMUTABLE_CACHE_CONTROL, add_fingerprint, is_immutable
+from media_gc import collect as collect_media_garbage
+from media_store import folder_path as media_path, is_content_addressed, release, store_file, store_upload
+from migrations import bootstrap as bootstrap_database, status as migration_status, upgrade as upgrade_schema
+from query_plans import check_indexes
+from queries import get_content, enable_shared_content_cache, ordered_features, products_with_images
+
+# Cloudinary helper only reads env vars here; the SDK itself is imported
+# on the first upload or delete
+from cloudinary_helper import is_cloudinary_configured, reload_storage_backend
 
 # Initialize CSRF Protection
-csrf = CSRFProtect(app)
-
-# Database configuration
-DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///cms.db')
-if DATABASE_URL.startswith('postgres://'):
-    DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql://')
-
-app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+csrf = CSRFProtect()
+
+# Rendered page cache for the public homepage (bumped on every admin write)
+page_cache = PageCache()
+
+# Routes are collected here and registered by create_app() per worker role
+public_routes = RouteTable()
+admin_routes = RouteTable()
+
+# Worker roles: which routes each serves, plus role-specific config.
+# Split roles expect the load balancer to send /admin to admin workers.
+ROLES = {
+    # Homepage, media and the contact form; never writes to the database
+    'public': ((public_routes,), {'MAX_CONTENT_LENGTH': 1024 * 1024}),
+    # The CMS behind /admin
+    'admin': ((admin_routes,), {}),
+    # Everything in one process (development, single-dyno deploys)
+    'all': ((public_routes, admin_routes), {}),
+}
+
+
+def create_app(role='all'):
+    """
+    Build the Flask application for a worker role
+
+    Args:
+        role: 'public', 'admin' or 'all' (see ROLES)
+
+    Returns:
+        Flask: configured application
+    """
+    if role not in ROLES:
+        raise ValueError(f"Unknown APP_ROLE: {role}")
+    route_tables, role_config = ROLES[role]
+
+    app = Flask(__name__)
+    app.config['APP_ROLE'] = role
+
+    # Security Configuration
+    app.secret_key = os.environ.get('SECRET_KEY', os.urandom(32))
+    app.config['SESSION_COOKIE_SECURE'] = os.environ.get('SESSION_COOKIE_SECURE', 'False') == 'True'
+    app.config['SESSION_COOKIE_HTTPONLY'] = True
+    app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+    app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=1)
+    app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 20 * 1024 * 1024))  # 20MB
+    app.config.update(role_config)
+
+    csrf.init_app(app)
+
+    # Database configuration
+    database_url = normalize_database_url(os.environ.get('DATABASE_URL', 'sqlite:///cms.db'))
+    replica_url = normalize_database_url(os.environ.get('DATABASE_REPLICA_URL'))
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Pool sizing, recycle, pre-ping and statement timeout (see db_engine.py)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(database_url)
+    # Optional read replica for public pages (see db_routing.py)
+    app.config['SQLALCHEMY_BINDS'] = replica_binds(replica_url)
+
+    db.init_app(app)
+
+    if replica_url:
+        app.before_request(choose_read_database)
+        app.after_request(remember_write)
+
+    # Resolve media storage (env vars are final after load_dotenv)
+    reload_storage_backend()
+
+    app.config['PAGE_CACHE_BACKEND'] = os.environ.get('PAGE_CACHE_BACKEND', 'file')
+    page_cache.init_app(app)
+
+    # Optionally share the content row across requests, validated by the same version
+    if os.environ.get('CONTENT_CACHE', 'request') == 'process':
+        enable_shared_content_cache(page_cache.backend)
+
+    # Other roles' routes are registered for url_for() only (they answer 404)
+    for routes in (public_routes, admin_routes):
+        routes.init_app(app, serve=routes in route_tables)
+
+    app.register_error_handler(RequestEntityTooLarge, handle_file_too_large)
+    # Registered first so it runs last, after every hook that touches the body
+    app.after_request(compress_response)
+    app.after_request(set_security_headers)
+    app.url_defaults(fingerprint_static_urls)
+    # Static files go out as their precompressed .br/.gz siblings when available
+    app.view_functions['static'] = send_static_file
+    app.after_request(set_cache_headers)
+    app.context_processor(inject_globals)
+
+    # Template helper for srcset data of stored images
+    app.jinja_env.globals['responsive_image'] = responsive_image
+    app.jinja_env.globals['hero_video'] = hero_video
+    # nonce="{{ csp_nonce() }}" on inline scripts (see security_headers)
+    app.jinja_env.globals['csp_nonce'] = csp_nonce
+
+    for command in (images_backfill_command, videos_backfill_command, media_worker_command, migrate_command, bootstrap_command,
+                    check_indexes_command, media_gc_command, compress_static_command):
+        app.cli.add_command(command)
+
+    return app
+
+
+def normalize_database_url(url):
+    """SQLAlchemy needs postgresql:// where PaaS providers hand out postgres://"""
+    if url and url.startswith('postgres://'):
+        url = url.replace('postgres://', 'postgresql://', 1)
+    return url
 
-db.init_app(app)
 
 # Allowed file extensions for upload
 ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp'}
@@ -52,126 +157,108 @@ def allowed_file(filename):
     """Check if uploaded file has allowed extension"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+ALLOWED_VIDEO_EXTENSIONS = {'mp4', 'webm', 'mov', 'avi', 'mkv'}
+
+def allowed_video(filename):
+    """Check if a hero video upload has an allowed extension"""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_VIDEO_EXTENSIONS
+
+def queue_product_derivatives(filenames):
+    """Queue responsive derivative generation for locally stored product images"""
+    paths = [media_path('products', name) for name in filenames]
+    enqueue('image_derivatives', paths=paths)
+
+def release_media(folder, filename):
+    """Delete a local media file (after commit) unless another row still uses it"""
+    if filename and not filename.startswith('http'):
+        release(folder, filename)
+
+def flash_gallery_failures(failed):
+    """Tell the admin which gallery files could not be uploaded"""
+    if failed:
+        names = ', '.join(result.filename for result in failed)
+        flash(f'Some gallery images failed to upload: {names}', 'warning')
+
 # Error handler for file too large
-@app.errorhandler(RequestEntityTooLarge)
 def handle_file_too_large(e):
     """Handle file upload exceeding maximum size"""
-    max_size_mb = app.config['MAX_CONTENT_LENGTH'] / (1024 * 1024)
+    max_size_mb = current_app.config['MAX_CONTENT_LENGTH'] / (1024 * 1024)
     flash(f'File is too large. Maximum upload size is {max_size_mb:.0f}MB.', 'danger')
+    # Admin endpoints are registered in every role, so go by the role
+    if current_app.config['APP_ROLE'] == 'public':
+        return redirect(url_for('index') + '#contact')
     return redirect(url_for('admin_dashboard'))
 
 # Security Headers
-@app.after_request
 def set_security_headers(response):
-    """Add security headers to all responses"""
-    response.headers['X-Content-Type-Options'] = 'nosniff'
-    response.headers['X-Frame-Options'] = 'DENY'
-    response.headers['X-XSS-Protection'] = '1; mode=block'
-    response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
-    response.headers['Content-Security-Policy'] = "default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; font-src 'self' https://fonts.gstatic.com; img-src 'self' data: https://res.cloudinary.com; media-src 'self' https://res.cloudinary.com; frame-src https://www.google.com;"
+    """Add the prebuilt security headers for the kind of route that answered"""
+    if request.endpoint in ('static', 'media_video'):
+        route_class = 'static'
+    elif response.mimetype == 'application/json':
+        route_class = 'api'
+    elif request.endpoint in admin_routes.endpoints():
+        route_class = 'admin'
+    else:
+        route_class = 'page'
+    return apply_headers(response, route_class)
+
+# Fingerprint static URLs (?v=...) so they can be cached as immutable
+def fingerprint_static_urls(endpoint, values):
+    if endpoint == 'static':
+        add_fingerprint(current_app.static_folder, values)
+
+# Caching policy
+def set_cache_headers(response):
+    """Long-lived caching for fingerprinted and content-addressed static files"""
+    if request.endpoint == 'static' and response.status_code in (200, 206, 304):
+        if is_immutable(request.view_args.get('filename'), request.args):
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
     return response
 
+# Read replica routing
+def choose_read_database():
+    """Public GET requests read from the replica unless a recent write may not have replicated"""
+    g.use_replica = (
+        request.method in ('GET', 'HEAD')
+        and request.endpoint in public_routes.endpoints()
+        and not recently_written(page_cache.changed_at())
+    )
+
 # Context processor to inject variables into all templates
-@app.context_processor
 def inject_globals():
     return {
         'current_year': datetime.now().year,
-        'content': Content.query.first()
+        'content': get_content()
     }
 
-# Initialize database
-with app.app_context():
-    db.create_all()
-
-    # Create default admin if doesn't exist with hashed password
-    if not Admin.query.first():
-        default_password = os.environ.get('ADMIN_PASSWORD', 'admin123')
-        admin = Admin(
-            username=os.environ.get('ADMIN_USERNAME', 'admin'),
-            password=generate_password_hash(default_password, method='pbkdf2:sha256')
-        )
-        db.session.add(admin)
-        db.session.commit()
-    
-    # Create default content if doesn't exist
-    if not Content.query.first():
-        content = Content(
-            # Hero Section
-            hero_label="◆ Innovation Redefined",
-            hero_title="The Future of Medical Aesthetics",
-            hero_description="ALTIUS BIOTECH brings cutting-edge medical aesthetic technology from South Korea's DSE Inc. to Myanmar. We're not just distributing equipment—we're revolutionizing healthcare delivery with premium CE-certified solutions.",
-            stat1_number="100%",
-            stat1_text="CE Certified Excellence",
-            stat2_number="DSE",
-            stat2_text="South Korea Technology",
-
-            # Features Section
-            features_label="◆ Why Choose Us",
-            features_title="Advancing Science. Elevating Life.",
-            features_description="ALTIUS BIOTECH Co., Ltd is Myanmar's premier distributor of advanced medical aesthetic devices, bringing world-class technology to your practice.",
-
-            # Products Section
-            products_label="◆ Our Portfolio",
-            products_title="Next-Gen Medical Devices",
-            products_description="Exclusive distributor of DSE Inc. (South Korea) premium aesthetic medical equipment",
-
-            # Contact Section
-            contact_tagline="◆ Connect With Us",
-            contact_title="Transform Your Practice",
-            contact_description="Ready to elevate your capabilities with premium medical aesthetic technology? Get in touch with our specialists to discover how ALTIUS BIOTECH can provide the solutions your practice needs to deliver exceptional results.",
-            contact_phone="+95 95128556",
-            contact_email="khinlapyaewoon6@gmail.com",
-            contact_address="No: 31, Inya Myaing Road\nKhayay Myaing Street, Golden Valley 1 Ward\nBahan, Yangon, Myanmar",
-
-            # Company Info
-            company_name="ALTIUS BIOTECH",
-            company_tagline="Advancing Science. Elevating Life.",
-            footer_text="Leading Myanmar's aesthetic medicine revolution with premium technology and unwavering commitment to excellence. Advancing science and elevating life through innovative healthcare solutions."
-        )
-        db.session.add(content)
-        db.session.commit()
-    
-    # Create default features if don't exist
-    if Feature.query.count() == 0:
-        features = [
-            Feature(icon='🎯', title='Premium Quality', description='Every device meets rigorous CE certification standards, ensuring the highest level of safety and performance for your patients.', order=1),
-            Feature(icon='🚀', title='Innovation First', description="Access to the latest aesthetic medical technology from DSE Inc., South Korea's leading manufacturer of advanced devices.", order=2),
-            Feature(icon='💎', title='Expert Support', description='Comprehensive training, technical support, and ongoing assistance to ensure optimal results with every treatment.', order=3),
-            Feature(icon='🏥', title='Trusted Partner', description="Serving Myanmar's leading medical clinics and hospitals with reliable, professional distribution services.", order=4),
-            Feature(icon='🌏', title='Global Vision', description='Expanding from local excellence to international impact, bringing global standards to Myanmar healthcare.', order=5),
-            Feature(icon='✓', title='Proven Results', description='Delivering measurable outcomes and exceptional patient satisfaction through superior medical technology.', order=6),
-        ]
-        db.session.add_all(features)
-        db.session.commit()
-    
-    # Create default products if don't exist
-    if Product.query.count() == 0:
-        products = [
-            Product(icon='⚡', title='Advanced Laser Systems', description='Precision-engineered laser technology delivering superior aesthetic results with unmatched safety profiles and patient comfort.', order=1),
-            Product(icon='💉', title='Injectable Solutions', description='State-of-the-art delivery systems optimized for precision, control, and exceptional patient experience.', order=2),
-            Product(icon='🔬', title='RF Energy Devices', description='Cutting-edge radiofrequency technology for skin rejuvenation and body contouring with proven clinical efficacy.', order=3),
-        ]
-        db.session.add_all(products)
-        db.session.commit()
-
-
 # ============ FRONTEND ============
-@app.route('/')
+@public_routes.route('/')
 def index():
-    content = Content.query.first()
-    features = Feature.query.order_by(Feature.order).all()
-    products = Product.query.order_by(Product.order).all()
-    return render_template('index.html', content=content, features=features, products=products)
+    def render():
+        content = get_content()
+        features = ordered_features()
+        products = products_with_images()
+        return render_template('index.html', content=content, features=features, products=products)
 
+    # Footer shows the current year, so it is part of the key
+    page = page_cache.get_or_render(('index', datetime.now().year), render)
 
-@app.route('/test-images')
+    # Let browsers revalidate with If-None-Match / If-Modified-Since and get a 304
+    response = make_response(page.body)
+    response.set_etag(page.etag)
+    response.last_modified = page.last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+@public_routes.route('/test-images')
 def test_images():
     """Diagnostic page to test image loading"""
-    products = Product.query.order_by(Product.order).all()
+    products = products_with_images()
     return render_template('test_images.html', products=products)
 
 
-@app.route('/sitemap.xml')
+@public_routes.route('/sitemap.xml')
 def sitemap():
     """Generate dynamic sitemap for search engines"""
     from datetime import datetime as dt
@@ -193,7 +280,7 @@ def sitemap():
     return response
 
 
-@app.route('/robots.txt')
+@public_routes.route('/robots.txt')
 def robots():
     """Generate robots.txt for search engines"""
     robots_txt = """# Allow all crawlers
@@ -214,7 +301,30 @@ Sitemap: https://altiusbiotech.com/sitemap.xml
     return robots_txt, 200, {'Content-Type': 'text/plain'}
 
 
-@app.route('/contact', methods=['POST'])
+@public_routes.route('/media/videos/<path:filename>')
+def media_video(filename):
+    """
+    Serve a locally stored hero video
+
+    Supports Range requests (206 Partial Content) so seeking and looping
+    never re-download the file, plus If-None-Match / If-Modified-Since.
+    The file is streamed with wsgi.file_wrapper (sendfile under gunicorn)
+    instead of being read into worker memory.
+    """
+    ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    response = send_from_directory(
+        os.path.join(current_app.static_folder, 'videos'),
+        filename,
+        mimetype=VIDEO_MIMETYPES.get(ext),
+        conditional=True,
+    )
+    response.headers['Accept-Ranges'] = 'bytes'
+    if is_content_addressed(filename):
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+
+@public_routes.route('/contact', methods=['POST'])
 def submit_contact():
     # Get form data
     name = request.form.get('name')
@@ -229,17 +339,17 @@ def submit_contact():
 
 
 # ============ ADMIN ============
-@app.route('/admin')
+@admin_routes.route('/admin')
 def admin_login():
     if 'admin' in session:
         # If already logged in, show dashboard directly
-        content = Content.query.first()
-        features = Feature.query.order_by(Feature.order).all()
-        products = Product.query.order_by(Product.order).all()
+        content = get_content()
+        features = ordered_features()
+        products = products_with_images()
 
         # Dashboard stats
-        features_count = Feature.query.count()
-        products_count = Product.query.count()
+        features_count = len(features)
+        products_count = len(products)
         unread_messages = 0
         recent_messages = []
 
@@ -255,7 +365,7 @@ def admin_login():
     return render_template('admin/login.html')
 
 
-@app.route('/admin/login', methods=['POST'])
+@admin_routes.route('/admin/login', methods=['POST'])
 def do_login():
     username = request.form.get('username')
     password = request.form.get('password')
@@ -272,24 +382,24 @@ def do_login():
     return redirect(url_for('admin_login'))
 
 
-@app.route('/admin/logout')
+@admin_routes.route('/admin/logout')
 def admin_logout():
     session.pop('admin', None)
     return redirect(url_for('admin_login'))
 
 
-@app.route('/admin/dashboard')
+@admin_routes.route('/admin/dashboard')
 def admin_dashboard():
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
 
-    content = Content.query.first()
-    features = Feature.query.order_by(Feature.order).all()
-    products = Product.query.order_by(Product.order).all()
+    content = get_content()
+    features = ordered_features()
+    products = products_with_images()
 
     # Dashboard stats
-    features_count = Feature.query.count()
-    products_count = Product.query.count()
+    features_count = len(features)
+    products_count = len(products)
     unread_messages = 0  # Placeholder for now
     recent_messages = []  # Placeholder for now
 
@@ -304,240 +414,240 @@ def admin_dashboard():
 
 
 def create_content_snapshot(content, description="Manual backup"):
-    """Create a backup snapshot of current content"""
-    snapshot = {
-        'hero_label': content.hero_label,
-        'hero_title': content.hero_title,
-        'hero_description': content.hero_description,
-        'stat1_number': content.stat1_number,
-        'stat1_text': content.stat1_text,
-        'stat2_number': content.stat2_number,
-        'stat2_text': content.stat2_text,
-        'features_label': content.features_label,
-        'features_title': content.features_title,
-        'features_description': content.features_description,
-        'products_label': content.products_label,
-        'products_title': content.products_title,
-        'products_description': content.products_description,
-        'contact_tagline': content.contact_tagline,
-        'contact_title': content.contact_title,
-        'contact_description': content.contact_description,
-        'contact_phone': content.contact_phone,
-        'contact_email': content.contact_email,
-        'contact_address': content.contact_address,
-        'company_name': content.company_name,
-        'company_tagline': content.company_tagline,
-        'footer_text': content.footer_text,
-    }
+    """Create a backup snapshot of current content (stored as a diff, see content_history.py)
 
-    history = ContentHistory(
-        content_snapshot=json.dumps(snapshot),
-        description=description
-    )
-    db.session.add(history)
-    db.session.commit()
+    The snapshot is only added to the session; it is committed together
+    with the caller's update in a single transaction.
+    """
+    history = create_snapshot(content, description)
     return history.id
 
 
-@app.route('/admin/update/hero', methods=['POST'])
+def save_section_changes(content, fields, description):
+    """
+    Apply submitted form values for one content section
+
+    Only fields whose submitted value differs from the stored one are
+    written, and the history snapshot is only taken when something changed.
+    Nothing is committed here.
+
+    Returns:
+        dict: {field: new value} for the fields that changed
+    """
+    changes = {}
+    for field in fields:
+        value = request.form.get(field)
+        if value is not None and value != getattr(content, field):
+            changes[field] = value
+
+    if changes:
+        create_content_snapshot(content, description)
+        for field, value in changes.items():
+            setattr(content, field, value)
+    return changes
+
+
+@admin_routes.route('/admin/update/hero', methods=['POST'])
 def update_hero():
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
 
-    content = Content.query.first()
-    create_content_snapshot(content, "Before hero section update")
-
-    # Update only hero fields
-    if request.form.get('hero_label') is not None:
-        content.hero_label = request.form.get('hero_label')
-    if request.form.get('hero_title') is not None:
-        content.hero_title = request.form.get('hero_title')
-    if request.form.get('hero_description') is not None:
-        content.hero_description = request.form.get('hero_description')
-    if request.form.get('stat1_number') is not None:
-        content.stat1_number = request.form.get('stat1_number')
-    if request.form.get('stat1_text') is not None:
-        content.stat1_text = request.form.get('stat1_text')
-    if request.form.get('stat2_number') is not None:
-        content.stat2_number = request.form.get('stat2_number')
-    if request.form.get('stat2_text') is not None:
-        content.stat2_text = request.form.get('stat2_text')
-
-    # Handle hero video upload
-    if 'hero_video' in request.files:
-        video_file = request.files['hero_video']
-        if video_file and video_file.filename and video_file.filename.strip():
-            # Validate video file extension
-            allowed_video_exts = {'mp4', 'webm', 'mov', 'avi', 'mkv'}
-            if '.' in video_file.filename and video_file.filename.rsplit('.', 1)[1].lower() in allowed_video_exts:
-                print(f"[DEBUG] Uploading hero video: {video_file.filename}")
-
-                # Delete old video if exists
-                if content.hero_video:
-                    if is_cloudinary_configured() and content.hero_video.startswith('http'):
-                        print(f"[DEBUG] Deleting old video from Cloudinary: {content.hero_video}")
-                        delete_file(content.hero_video)
-                    else:
-                        # Delete from local storage
-                        old_video_path = os.path.join('static', 'videos', content.hero_video)
-                        if os.path.exists(old_video_path):
-                            print(f"[DEBUG] Deleting old local video: {old_video_path}")
-                            os.remove(old_video_path)
-
-                # Upload new video
-                if is_cloudinary_configured():
-                    print("[DEBUG] Uploading to Cloudinary...")
-                    video_url = upload_video(video_file, folder='altius-biotech/videos')
-                    if not video_url:
-                        flash('Failed to upload video to cloud storage.', 'danger')
-                        return redirect(url_for('admin_dashboard'))
-                    print(f"[DEBUG] Video uploaded: {video_url}")
-                else:
-                    # Fallback to local storage
-                    print("[DEBUG] Cloudinary not configured, using local storage...")
-                    filename = secure_filename(video_file.filename)
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    video_filename = f"hero_{timestamp}_{filename}"
-                    video_path = os.path.join('static', 'videos', video_filename)
-                    os.makedirs(os.path.join('static', 'videos'), exist_ok=True)
-                    video_file.save(video_path)
-                    video_url = video_filename
-                    print(f"[DEBUG] Video saved locally: {video_filename}")
-
-                content.hero_video = video_url
-                print(f"[DEBUG] Updated content.hero_video to: {content.hero_video}")
+    content = get_content(for_update=True)
+
+    # Update only hero fields that changed
+    changes = save_section_changes(content, [
+        'hero_label',
+        'hero_title',
+        'hero_description',
+        'stat1_number',
+        'stat1_text',
+        'stat2_number',
+        'stat2_text',
+    ], "Before hero section update")
+
+    # Handle hero video upload: either a regular file field or the id of a
+    # finished chunked upload (large videos, see chunked_uploads)
+    old_video = None
+    video_changed = False
+    video_file = request.files.get('hero_video')
+    chunked = None
+    if request.form.get('hero_video_upload'):
+        chunked = finished_upload(request.form['hero_video_upload'])
+        if chunked is None:
+            flash('The video upload did not finish. Please upload it again.', 'danger')
+            return redirect(url_for('admin_dashboard'))
+        video_name = chunked.filename
+    else:
+        video_name = video_file.filename.strip() if video_file and video_file.filename else ''
+
+    if video_name:
+        # Validate video file extension
+        if allowed_video(video_name):
+            print(f"[DEBUG] Uploading hero video: {video_name}")
+
+            # Upload new video (the old one is released once nothing references it;
+            # an old Cloudinary video is deleted by the media worker)
+            if is_cloudinary_configured():
+                # Hand the upload to the media worker so the request returns immediately
+                spooled = spool_path(chunked.path, chunked.filename) if chunked else spool_file(video_file)
+                job = enqueue('upload_hero_video', file=spooled)
+                print(f"[DEBUG] Queued Cloudinary video upload as job {job.id}")
+                video_changed = True
+                flash('Hero video is uploading in the background. It will appear on the site when finished.', 'info')
             else:
-                flash('Invalid video file type. Only MP4, WEBM, MOV, AVI, MKV allowed.', 'danger')
-                return redirect(url_for('admin_dashboard'))
+                # Fallback to local storage
+                print("[DEBUG] Cloudinary not configured, using local storage...")
+                if chunked:
+                    video_filename = store_file(chunked.path, 'videos', chunked.filename)
+                else:
+                    video_filename = store_upload(video_file, 'videos')
+                print(f"[DEBUG] Video saved locally: {video_filename}")
+                if video_filename != content.hero_video:
+                    old_video = content.hero_video
+                    content.hero_video = video_filename
+                    video_changed = True
+                    print(f"[DEBUG] Updated content.hero_video to: {content.hero_video}")
+                    # Web-optimized variants and poster are made in the background
+                    enqueue('transcode_video', path=media_path('videos', video_filename))
+            if chunked:
+                # The .part file has moved on; drop the upload's metadata
+                discard_upload(chunked.id)
+        else:
+            flash('Invalid video file type. Only MP4, WEBM, MOV, AVI, MKV allowed.', 'danger')
+            return redirect(url_for('admin_dashboard'))
+
+    if not changes and not video_changed:
+        flash('No changes to save.', 'info')
+        return redirect(url_for('admin_dashboard'))
 
     db.session.commit()
+    page_cache.invalidate()
+    release_media('videos', old_video)
+    run_inline_jobs(page_cache.invalidate)
     flash('Hero section updated successfully!', 'success')
     return redirect(url_for('admin_dashboard'))
 
 
-@app.route('/admin/delete/hero-video', methods=['GET', 'POST'])
+@admin_routes.route('/admin/delete/hero-video', methods=['GET', 'POST'])
 def delete_hero_video():
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
 
-    content = Content.query.first()
+    content = get_content(for_update=True)
     if not content or not content.hero_video:
         flash('No hero video to delete.', 'warning')
         return redirect(url_for('admin_dashboard'))
 
     create_content_snapshot(content, "Before deleting hero video")
 
-    # Delete the video file
-    if content.hero_video.startswith('http'):
-        # Delete from Cloudinary
-        if is_cloudinary_configured():
-            print(f"[DEBUG] Deleting hero video from Cloudinary: {content.hero_video}")
-            if delete_file(content.hero_video):
-                print("[DEBUG] Video deleted from Cloudinary successfully")
-            else:
-                print("[DEBUG] Failed to delete video from Cloudinary")
-    else:
-        # Delete from local storage
-        video_path = os.path.join('static', 'videos', content.hero_video)
-        if os.path.exists(video_path):
-            print(f"[DEBUG] Deleting local video: {video_path}")
-            os.remove(video_path)
-            print("[DEBUG] Local video deleted successfully")
+    # Delete the video file from Cloudinary (local files are released after commit)
+    old_video = content.hero_video
+    if old_video.startswith('http') and is_cloudinary_configured():
+        print(f"[DEBUG] Queueing Cloudinary delete for hero video: {old_video}")
+        enqueue_remote_delete(old_video)
 
     # Clear the hero_video field
     content.hero_video = None
     db.session.commit()
+    page_cache.invalidate()
+    release_media('videos', old_video)
+    run_inline_jobs()
 
     flash('Hero background video deleted successfully!', 'success')
     return redirect(url_for('admin_dashboard'))
 
 
-@app.route('/admin/update/features', methods=['POST'])
+@admin_routes.route('/admin/update/features', methods=['POST'])
 def update_features():
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
 
-    content = Content.query.first()
-    create_content_snapshot(content, "Before features section update")
+    content = get_content(for_update=True)
 
-    # Update only features section header fields
-    if request.form.get('features_label') is not None:
-        content.features_label = request.form.get('features_label')
-    if request.form.get('features_title') is not None:
-        content.features_title = request.form.get('features_title')
-    if request.form.get('features_description') is not None:
-        content.features_description = request.form.get('features_description')
+    # Update only features section header fields that changed
+    changes = save_section_changes(content, [
+        'features_label',
+        'features_title',
+        'features_description',
+    ], "Before features section update")
+
+    if not changes:
+        flash('No changes to save.', 'info')
+        return redirect(url_for('admin_dashboard'))
 
     db.session.commit()
+    page_cache.invalidate()
     flash('Features section updated successfully!', 'success')
     return redirect(url_for('admin_dashboard'))
 
 
-@app.route('/admin/update/products', methods=['POST'])
+@admin_routes.route('/admin/update/products', methods=['POST'])
 def update_products():
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
 
-    content = Content.query.first()
-    create_content_snapshot(content, "Before products section update")
+    content = get_content(for_update=True)
+
+    # Update only products section header fields that changed
+    changes = save_section_changes(content, [
+        'products_label',
+        'products_title',
+        'products_description',
+    ], "Before products section update")
 
-    # Update only products section header fields
-    if request.form.get('products_label') is not None:
-        content.products_label = request.form.get('products_label')
-    if request.form.get('products_title') is not None:
-        content.products_title = request.form.get('products_title')
-    if request.form.get('products_description') is not None:
-        content.products_description = request.form.get('products_description')
+    if not changes:
+        flash('No changes to save.', 'info')
+        return redirect(url_for('admin_dashboard'))
 
     db.session.commit()
+    page_cache.invalidate()
     flash('Products section updated successfully!', 'success')
     return redirect(url_for('admin_dashboard'))
 
 
-@app.route('/admin/update/contact', methods=['POST'])
+@admin_routes.route('/admin/update/contact', methods=['POST'])
 def update_contact():
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
 
-    content = Content.query.first()
-    create_content_snapshot(content, "Before contact section update")
-
-    # Update only contact fields
-    if request.form.get('contact_tagline') is not None:
-        content.contact_tagline = request.form.get('contact_tagline')
-    if request.form.get('contact_title') is not None:
-        content.contact_title = request.form.get('contact_title')
-    if request.form.get('contact_description') is not None:
-        content.contact_description = request.form.get('contact_description')
-    if request.form.get('contact_phone') is not None:
-        content.contact_phone = request.form.get('contact_phone')
-    if request.form.get('contact_email') is not None:
-        content.contact_email = request.form.get('contact_email')
-    if request.form.get('contact_address') is not None:
-        content.contact_address = request.form.get('contact_address')
+    content = get_content(for_update=True)
+
+    # Update only contact fields that changed
+    changes = save_section_changes(content, [
+        'contact_tagline',
+        'contact_title',
+        'contact_description',
+        'contact_phone',
+        'contact_email',
+        'contact_address',
+    ], "Before contact section update")
+
+    if not changes:
+        flash('No changes to save.', 'info')
+        return redirect(url_for('admin_dashboard'))
 
     db.session.commit()
+    page_cache.invalidate()
     flash('Contact section updated successfully!', 'success')
     return redirect(url_for('admin_dashboard'))
 
 
-@app.route('/admin/update/general', methods=['POST'])
+@admin_routes.route('/admin/update/general', methods=['POST'])
 def update_general():
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
 
-    content = Content.query.first()
-    create_content_snapshot(content, "Before general settings update")
+    content = get_content(for_update=True)
 
-    # Update only general/company fields
-    if request.form.get('company_name') is not None:
-        content.company_name = request.form.get('company_name')
-    if request.form.get('company_tagline') is not None:
-        content.company_tagline = request.form.get('company_tagline')
-    if request.form.get('footer_text') is not None:
-        content.footer_text = request.form.get('footer_text')
+    # Update only general/company fields that changed
+    changes = save_section_changes(content, [
+        'company_name',
+        'company_tagline',
+        'footer_text',
+    ], "Before general settings update")
 
     # Handle logo upload with security validation
+    logo_changed = False
     if 'logo' in request.files:
         logo_file = request.files['logo']
         if logo_file and logo_file.filename:
@@ -551,14 +661,25 @@ def update_general():
             # Always save as logo.jpg for consistency
             logo_path = os.path.join('static', 'images', 'logo.jpg')
             logo_file.save(logo_path)
+            logo_changed = True
             flash('Logo updated successfully!', 'success')
 
+    if not changes:
+        if logo_changed:
+            # Only the logo file changed: no database write, but cached
+            # pages still carry the old logo fingerprint
+            page_cache.invalidate()
+        else:
+            flash('No changes to save.', 'info')
+        return redirect(url_for('admin_dashboard'))
+
     db.session.commit()
+    page_cache.invalidate()
     flash('General settings updated successfully!', 'success')
     return redirect(url_for('admin_dashboard'))
 
 
-@app.route('/admin/feature/add', methods=['POST'])
+@admin_routes.route('/admin/feature/add', methods=['POST'])
 def add_feature():
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
@@ -569,15 +690,9 @@ def add_feature():
         image_file = request.files['feature_image']
         if image_file and image_file.filename:
             if allowed_file(image_file.filename):
-                # Generate unique filename
-                filename = secure_filename(image_file.filename)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                image_filename = f"feature_{timestamp}_{filename}"
-                image_path = os.path.join('static', 'images', 'features', image_filename)
-
-                # Create features directory if it doesn't exist
-                os.makedirs(os.path.join('static', 'images', 'features'), exist_ok=True)
-                image_file.save(image_path)
+                # Stored under the hash of its bytes (duplicates share one file)
+                image_filename = store_upload(image_file, 'features')
+                enqueue('image_derivatives', paths=[media_path('features', image_filename)])
             else:
                 flash('Invalid image file type. Only JPG, PNG, GIF, and WEBP allowed.', 'danger')
                 return redirect(url_for('admin_dashboard'))
@@ -591,12 +706,14 @@ def add_feature():
     )
     db.session.add(feature)
     db.session.commit()
+    page_cache.invalidate()
+    run_inline_jobs(page_cache.invalidate)
     flash('Feature added successfully!', 'success')
 
     return redirect(url_for('admin_dashboard'))
 
 
-@app.route('/admin/feature/edit/<int:id>', methods=['GET', 'POST'])
+@admin_routes.route('/admin/feature/edit/<int:id>', methods=['GET', 'POST'])
 def edit_feature(id):
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
@@ -609,55 +726,49 @@ def edit_feature(id):
         feature.order = request.form.get('order', 0)
 
         # Handle feature image upload
+        old_image = None
         if 'feature_image' in request.files:
             image_file = request.files['feature_image']
             if image_file and image_file.filename:
                 if allowed_file(image_file.filename):
-                    # Delete old image if exists
-                    if feature.image:
-                        old_image_path = os.path.join('static', 'images', 'features', feature.image)
-                        if os.path.exists(old_image_path):
-                            os.remove(old_image_path)
-
-                    # Save new image
-                    filename = secure_filename(image_file.filename)
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    image_filename = f"feature_{timestamp}_{filename}"
-                    image_path = os.path.join('static', 'images', 'features', image_filename)
-                    os.makedirs(os.path.join('static', 'images', 'features'), exist_ok=True)
-                    image_file.save(image_path)
+                    # Save new image; the old one is released after commit
+                    old_image = feature.image
+                    image_filename = store_upload(image_file, 'features')
                     feature.image = image_filename
+                    enqueue('image_derivatives', paths=[media_path('features', image_filename)])
                 else:
                     flash('Invalid image file type. Only JPG, PNG, GIF, and WEBP allowed.', 'danger')
                     return redirect(url_for('edit_feature', id=id))
 
         db.session.commit()
+        page_cache.invalidate()
+        release_media('features', old_image)
+        run_inline_jobs(page_cache.invalidate)
         flash('Feature updated successfully!', 'success')
         return redirect(url_for('admin_dashboard'))
 
     return render_template('admin/edit_feature.html', feature=feature)
 
 
-@app.route('/admin/feature/delete/<int:id>')
+@admin_routes.route('/admin/feature/delete/<int:id>')
 def delete_feature(id):
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
 
     feature = Feature.query.get(id)
     if feature:
-        # Delete image file if exists
-        if feature.image:
-            image_path = os.path.join('static', 'images', 'features', feature.image)
-            if os.path.exists(image_path):
-                os.remove(image_path)
+        image_filename = feature.image
         db.session.delete(feature)
         db.session.commit()
+        page_cache.invalidate()
+        # Delete image file if no other row uses it
+        release_media('features', image_filename)
         flash('Feature deleted successfully!', 'success')
 
     return redirect(url_for('admin_dashboard'))
 
 
-@app.route('/admin/product/add', methods=['POST'])
+@admin_routes.route('/admin/product/add', methods=['POST'])
 def add_product():
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
@@ -665,6 +776,7 @@ def add_product():
     # Handle product images upload (single or multiple)
     image_filename = None
     gallery_images = []
+    spooled_images = None  # Cloudinary uploads handed to the media worker
 
     if 'product_images' in request.files:
         uploaded_files = request.files.getlist('product_images')
@@ -675,42 +787,27 @@ def add_product():
             # First image becomes the main product image
             first_image = valid_files[0]
 
-            if allowed_file(first_image.filename):
-                # Upload first image as main image (Cloudinary or local)
-                if is_cloudinary_configured():
-                    image_url = upload_image(first_image, folder='altius-biotech/products')
-                    if not image_url:
-                        flash('Failed to upload main image to cloud storage.', 'danger')
-                        return redirect(url_for('admin_dashboard'))
-                    image_filename = image_url
-                else:
-                    filename = secure_filename(first_image.filename)
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    image_filename = f"product_{timestamp}_{filename}"
-                    image_path = os.path.join('static', 'images', 'products', image_filename)
-                    os.makedirs(os.path.join('static', 'images', 'products'), exist_ok=True)
-                    first_image.save(image_path)
-            else:
+            if not allowed_file(first_image.filename):
                 flash('Invalid image file type. Only JPG, PNG, GIF, and WEBP allowed.', 'danger')
                 return redirect(url_for('admin_dashboard'))
 
             # Remaining images go to gallery
-            if len(valid_files) > 1:
-                for idx, gallery_file in enumerate(valid_files[1:], start=1):
-                    if allowed_file(gallery_file.filename):
-                        # Upload to Cloudinary or save locally
-                        if is_cloudinary_configured():
-                            image_url = upload_image(gallery_file, folder='altius-biotech/products')
-                            if image_url:
-                                gallery_images.append((image_url, idx))
-                        else:
-                            filename = secure_filename(gallery_file.filename)
-                            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                            gallery_filename = f"product_gallery_{timestamp}_{idx}_{filename}"
-                            image_path = os.path.join('static', 'images', 'products', gallery_filename)
-                            os.makedirs(os.path.join('static', 'images', 'products'), exist_ok=True)
-                            gallery_file.save(image_path)
-                            gallery_images.append((gallery_filename, idx))
+            gallery_files = [f for f in valid_files[1:] if allowed_file(f.filename)]
+
+            if is_cloudinary_configured():
+                # Spool everything; the media worker uploads after the product exists
+                spooled_images = {
+                    'main': spool_file(first_image),
+                    'gallery': [spool_file(f) + [order] for order, f in enumerate(gallery_files, start=1)],
+                }
+            else:
+                image_filename = store_upload(first_image, 'products')
+
+                # Gallery files are saved concurrently
+                uploaded, failed = upload_gallery(gallery_files, LocalUploader(), start_order=1)
+                gallery_images = [(result.url, result.order) for result in uploaded]
+                flash_gallery_failures(failed)
+                queue_product_derivatives([image_filename] + [result.url for result in uploaded])
 
     product = Product(
         icon=None,  # No longer using emoji icons
@@ -731,13 +828,19 @@ def add_product():
         )
         db.session.add(product_image)
 
+    if spooled_images:
+        enqueue('upload_product_images', product_id=product.id, **spooled_images)
+        flash('Product images are uploading in the background.', 'info')
+
     db.session.commit()
+    page_cache.invalidate()
+    run_inline_jobs(page_cache.invalidate)
     flash('Product added successfully!', 'success')
 
     return redirect(url_for('admin_dashboard'))
 
 
-@app.route('/admin/product/edit/<int:id>', methods=['GET', 'POST'])
+@admin_routes.route('/admin/product/edit/<int:id>', methods=['GET', 'POST'])
 def edit_product(id):
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
@@ -750,6 +853,7 @@ def edit_product(id):
         product.order = request.form.get('order', 0)
 
         # Handle product images upload (single or multiple)
+        old_image = None
         if 'product_images' in request.files:
             uploaded_files = request.files.getlist('product_images')
             # Filter out empty files
@@ -759,103 +863,79 @@ def edit_product(id):
                 # First image becomes the main product image
                 first_image = valid_files[0]
 
-                if allowed_file(first_image.filename):
-                    # Delete old main image if exists
-                    if product.image:
-                        if is_cloudinary_configured() and product.image.startswith('http'):
-                            delete_file(product.image)
-                        else:
-                            old_image_path = os.path.join('static', 'images', 'products', product.image)
-                            if os.path.exists(old_image_path):
-                                os.remove(old_image_path)
-
-                    # Upload first image as main image
-                    if is_cloudinary_configured():
-                        image_url = upload_image(first_image, folder='altius-biotech/products')
-                        if not image_url:
-                            flash('Failed to upload main image to cloud storage.', 'danger')
-                            return redirect(url_for('edit_product', id=id))
-                        product.image = image_url
-                    else:
-                        filename = secure_filename(first_image.filename)
-                        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                        image_filename = f"product_{timestamp}_{filename}"
-                        image_path = os.path.join('static', 'images', 'products', image_filename)
-                        os.makedirs(os.path.join('static', 'images', 'products'), exist_ok=True)
-                        first_image.save(image_path)
-                        product.image = image_filename
-                else:
+                if not allowed_file(first_image.filename):
                     flash('Invalid image file type. Only JPG, PNG, GIF, and WEBP allowed.', 'danger')
                     return redirect(url_for('edit_product', id=id))
 
-                # Remaining images go to gallery
-                if len(valid_files) > 1:
+                # Remaining images go to gallery, after the existing ones
+                gallery_files = [f for f in valid_files[1:] if allowed_file(f.filename)]
+                max_order = 0
+                if gallery_files:
                     max_order = db.session.query(db.func.max(ProductImage.order)).filter_by(product_id=product.id).scalar() or 0
 
-                    for idx, gallery_file in enumerate(valid_files[1:], start=1):
-                        if allowed_file(gallery_file.filename):
-                            # Upload to Cloudinary or save locally
-                            if is_cloudinary_configured():
-                                image_url = upload_image(gallery_file, folder='altius-biotech/products')
-                                if not image_url:
-                                    continue  # Skip this file if upload fails
-                            else:
-                                filename = secure_filename(gallery_file.filename)
-                                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                                image_filename = f"product_gallery_{timestamp}_{idx}_{filename}"
-                                image_path = os.path.join('static', 'images', 'products', image_filename)
-                                os.makedirs(os.path.join('static', 'images', 'products'), exist_ok=True)
-                                gallery_file.save(image_path)
-                                image_url = image_filename
-
-                            # Create ProductImage entry
-                            product_image = ProductImage(
-                                product_id=product.id,
-                                image_url=image_url,
-                                order=max_order + idx
-                            )
-                            db.session.add(product_image)
+                if is_cloudinary_configured():
+                    # The media worker uploads the files and swaps the main image,
+                    # then queues the old main image for deletion
+                    enqueue('upload_product_images',
+                            product_id=product.id,
+                            main=spool_file(first_image),
+                            gallery=[spool_file(f) + [max_order + idx] for idx, f in enumerate(gallery_files, start=1)])
+                    flash('Product images are uploading in the background.', 'info')
+                else:
+                    # Old main image is released after commit
+                    old_image = product.image
+                    image_filename = store_upload(first_image, 'products')
+                    product.image = image_filename
+
+                    # Gallery files are saved concurrently
+                    uploaded, failed = upload_gallery(gallery_files, LocalUploader(), start_order=max_order + 1)
+                    for result in uploaded:
+                        # Create ProductImage entry
+                        product_image = ProductImage(
+                            product_id=product.id,
+                            image_url=result.url,
+                            order=result.order
+                        )
+                        db.session.add(product_image)
+                    flash_gallery_failures(failed)
+                    queue_product_derivatives([image_filename] + [result.url for result in uploaded])
 
         db.session.commit()
+        page_cache.invalidate()
+        release_media('products', old_image)
+        run_inline_jobs(page_cache.invalidate)
         flash('Product updated successfully!', 'success')
         return redirect(url_for('admin_dashboard'))
 
     return render_template('admin/edit_product.html', product=product)
 
 
-@app.route('/admin/product/delete/<int:id>')
+@admin_routes.route('/admin/product/delete/<int:id>')
 def delete_product(id):
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
 
     product = Product.query.get(id)
     if product:
-        # Delete main image file if exists
-        if product.image:
-            if is_cloudinary_configured() and product.image.startswith('http'):
-                delete_file(product.image)
-            else:
-                image_path = os.path.join('static', 'images', 'products', product.image)
-                if os.path.exists(image_path):
-                    os.remove(image_path)
-
-        # Delete gallery images (cascade will handle DB deletion)
-        for img in product.images:
-            if is_cloudinary_configured() and img.image_url.startswith('http'):
-                delete_file(img.image_url)
-            else:
-                image_path = os.path.join('static', 'images', 'products', img.image_url)
-                if os.path.exists(image_path):
-                    os.remove(image_path)
+        # Main image and gallery images (cascade will handle DB deletion)
+        image_urls = [url for url in [product.image] + [img.image_url for img in product.images] if url]
+        if is_cloudinary_configured():
+            # One job, bulk-deleted after the commit below; failures are retried
+            enqueue_remote_delete(*image_urls)
 
         db.session.delete(product)
         db.session.commit()
+        page_cache.invalidate()
+        # Local files are deleted once no other row references them
+        for url in image_urls:
+            release_media('products', url)
+        run_inline_jobs()
         flash('Product deleted successfully!', 'success')
 
     return redirect(url_for('admin_dashboard'))
 
 
-@app.route('/admin/product/image/delete/<int:id>', methods=['GET', 'POST'])
+@admin_routes.route('/admin/product/image/delete/<int:id>', methods=['GET', 'POST'])
 def delete_product_image(id):
     """Delete a single gallery image"""
     if 'admin' not in session:
@@ -865,21 +945,21 @@ def delete_product_image(id):
     product_id = image.product_id
 
     # Delete file
-    if is_cloudinary_configured() and image.image_url.startswith('http'):
-        delete_file(image.image_url)
-    else:
-        image_path = os.path.join('static', 'images', 'products', image.image_url)
-        if os.path.exists(image_path):
-            os.remove(image_path)
+    image_url = image.image_url
+    if is_cloudinary_configured() and image_url.startswith('http'):
+        enqueue_remote_delete(image_url)
 
     db.session.delete(image)
     db.session.commit()
+    page_cache.invalidate()
+    release_media('products', image_url)
+    run_inline_jobs()
     flash('Gallery image deleted successfully!', 'success')
 
     return redirect(url_for('edit_product', id=product_id))
 
 
-@app.route('/admin/product/<int:id>/reorder-images', methods=['POST'])
+@admin_routes.route('/admin/product/<int:id>/reorder-images', methods=['POST'])
 def reorder_product_images(id):
     """Reorder product gallery images and update main image"""
     if 'admin' not in session:
@@ -892,79 +972,141 @@ def reorder_product_images(id):
         return jsonify({'success': False, 'error': 'Invalid data'}), 400
 
     try:
-        images_list = data['images']
+        # Positions as submitted; ids arrive as numbers or strings
+        positions = [str(image_data['id']) for image_data in data['images']]
 
-        # First image becomes the main product image
-        if images_list and len(images_list) > 0:
-            first_image = images_list[0]
-
-            # Check if the first image is currently the main image
-            if first_image['id'] == 'main':
-                # Main image stays as main, just update gallery order
-                for idx, image_data in enumerate(images_list[1:], start=1):
-                    image_id = image_data['id']
-                    if image_id != 'main':
-                        image = ProductImage.query.get(image_id)
-                        if image and image.product_id == product.id:
-                            image.order = idx
-            else:
-                # A gallery image is now first, so it becomes the new main image
-                new_main_image_id = first_image['id']
-                new_main_image = ProductImage.query.get(new_main_image_id)
-
-                if new_main_image and new_main_image.product_id == product.id:
-                    # Save old main image URL
-                    old_main_url = product.image
-
-                    # Set new main image
-                    product.image = new_main_image.image_url
-
-                    # Delete the new main image from ProductImage table
-                    db.session.delete(new_main_image)
-
-                    # Add old main image to ProductImage table if it exists
-                    if old_main_url:
-                        # Find the order for old main image
-                        old_main_order = 1
-                        for idx, img_data in enumerate(images_list):
-                            if img_data['id'] == 'main':
-                                old_main_order = idx
-                                break
-
-                        old_main_product_image = ProductImage(
-                            product_id=product.id,
-                            image_url=old_main_url,
-                            order=old_main_order
-                        )
-                        db.session.add(old_main_product_image)
+        # The whole gallery in one SELECT; ids of other products are ignored
+        gallery = {str(image.id): image for image in product.images}
 
-                    # Update order for remaining gallery images
-                    for idx, image_data in enumerate(images_list[1:], start=1):
-                        image_id = image_data['id']
-                        if image_id != 'main' and image_id != new_main_image_id:
-                            image = ProductImage.query.get(image_id)
-                            if image and image.product_id == product.id:
-                                image.order = idx
+        # First image becomes the main product image
+        new_main_image = gallery.get(positions[0]) if positions else None
+        if new_main_image is not None:
+            # A gallery image is now first: swap it with the old main image
+            old_main_url = product.image
+            product.image = new_main_image.image_url
+            db.session.delete(new_main_image)
+
+            if old_main_url:
+                # The old main image keeps the position it was dragged to
+                old_main_order = positions.index('main') if 'main' in positions else 1
+                db.session.add(ProductImage(
+                    product_id=product.id,
+                    image_url=old_main_url,
+                    order=old_main_order
+                ))
+
+        # Update the order of the remaining gallery images in one executemany
+        changes = [{'id': gallery[image_id].id, 'order': idx}
+                   for idx, image_id in enumerate(positions)
+                   if image_id in gallery
+                   and gallery[image_id] is not new_main_image
+                   and gallery[image_id].order != idx]
+        if changes:
+            db.session.execute(update(ProductImage), changes)
+        elif new_main_image is None:
+            # Same order as before: nothing to write
+            return jsonify({'success': True})
 
         db.session.commit()
+        page_cache.invalidate()
         return jsonify({'success': True})
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/admin/history')
+@admin_routes.route('/admin/uploads', methods=['POST'])
+def create_chunked_upload():
+    """Start a resumable upload of a large hero video; the dashboard then PUTs its chunks"""
+    if 'admin' not in session:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+
+    data = request.get_json(silent=True) or {}
+    filename = data.get('filename') or ''
+    if not allowed_video(filename):
+        return jsonify({'success': False, 'error': 'Invalid video file type. Only MP4, WEBM, MOV, AVI, MKV allowed.'}), 400
+
+    try:
+        upload = create_upload(filename, data.get('size'))
+    except UploadError as e:
+        return jsonify({'success': False, 'error': str(e)}), e.status
+    return jsonify({'success': True, 'id': upload.id, 'offset': 0, 'chunk_size': UPLOAD_CHUNK_SIZE}), 201
+
+
+@admin_routes.route('/admin/uploads/<upload_id>', methods=['GET', 'PUT', 'DELETE'])
+def chunked_upload(upload_id):
+    """
+    GET: bytes received so far (where to resume after a dropped connection)
+    PUT: append the request body at the Upload-Offset header
+    DELETE: abort the upload
+    """
+    if 'admin' not in session:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+
+    try:
+        if request.method == 'DELETE':
+            discard_upload(upload_id)
+            return jsonify({'success': True})
+        if request.method == 'PUT':
+            offset = request.headers.get('Upload-Offset', type=int)
+            if offset is None:
+                return jsonify({'success': False, 'error': 'Missing Upload-Offset header'}), 400
+            upload = write_chunk(upload_id, offset, request.stream)
+        else:
+            upload = get_upload(upload_id)
+    except UploadError as e:
+        return jsonify({'success': False, 'error': str(e), 'offset': e.offset}), e.status
+    return jsonify({'success': True, 'offset': upload.offset, 'size': upload.size,
+                    'chunk_size': UPLOAD_CHUNK_SIZE, 'complete': upload.offset == upload.size})
+
+
+@admin_routes.route('/admin/media-jobs')
+def media_jobs_status():
+    """Background upload/delete status, polled by the dashboard"""
+    if 'admin' not in session:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+
+    return jsonify(job_status())
+
+
+@admin_routes.route('/admin/pool-stats')
+def db_pool_stats():
+    """Connection pool usage of the worker process that answers the request"""
+    if 'admin' not in session:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+
+    engines = {bind or 'primary': pool_stats(engine) for bind, engine in db.engines.items()}
+    return jsonify({'success': True, 'pid': os.getpid(), 'engines': engines})
+
+
+@admin_routes.route('/admin/history')
 def admin_history():
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
 
-    # Get all history entries, newest first, limit to last 20
-    history_entries = ContentHistory.query.order_by(ContentHistory.created_at.desc()).limit(20).all()
+    # One page of entries, newest first (snapshot bodies are not loaded)
+    cursor = request.args.get('before')
+    history_entries, next_cursor = history_page(cursor)
+
+    return render_template('admin/history.html', history_entries=history_entries,
+                           next_cursor=next_cursor, is_first_page=not cursor)
 
-    return render_template('admin/history.html', history_entries=history_entries)
+
+@admin_routes.route('/admin/history/<int:history_id>/diff')
+def history_diff(history_id):
+    """Fields a rollback to this entry would change, loaded on demand by history.html"""
+    if 'admin' not in session:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+
+    history = ContentHistory.query.get(history_id)
+    if not history:
+        return jsonify({'success': False, 'error': 'History entry not found'}), 404
+
+    changes = diff_snapshot(history, content_state(get_content()))
+    return jsonify({'success': True, 'changes': changes})
 
 
-@app.route('/admin/rollback/<int:history_id>')
+@admin_routes.route('/admin/rollback/<int:history_id>')
 def admin_rollback(history_id):
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
@@ -976,37 +1118,144 @@ def admin_rollback(history_id):
         return redirect(url_for('admin_history'))
 
     # Get current content
-    content = Content.query.first()
+    content = get_content(for_update=True)
 
-    # Create a backup of current state before rollback
-    create_content_snapshot(content, "Before rollback to version from " + history.created_at.strftime('%Y-%m-%d %H:%M:%S'))
+    # Restore from snapshot (rebuilt from the nearest keyframe and its diffs)
+    snapshot = load_snapshot(history)
+    if snapshot == content_state(content):
+        flash('Content already matches that version.', 'info')
+        return redirect(url_for('admin_dashboard'))
 
-    # Restore from snapshot
-    snapshot = json.loads(history.content_snapshot)
+    # Create a backup of current state before rollback (same transaction)
+    create_content_snapshot(content, "Before rollback to version from " + history.created_at.strftime('%Y-%m-%d %H:%M:%S'))
     for key, value in snapshot.items():
         setattr(content, key, value)
 
     db.session.commit()
+    page_cache.invalidate()
 
     flash('Content successfully restored to previous version!', 'success')
     return redirect(url_for('admin_dashboard'))
 
 
-@app.route('/admin/history/delete/<int:history_id>')
+@admin_routes.route('/admin/history/delete/<int:history_id>')
 def delete_history(history_id):
     if 'admin' not in session:
         return redirect(url_for('admin_login'))
 
     history = ContentHistory.query.get(history_id)
     if history:
-        db.session.delete(history)
+        delete_entry(history)
         db.session.commit()
         flash('History entry deleted.', 'success')
 
     return redirect(url_for('admin_history'))
 
 
+@click.command('images-backfill')
+@with_appcontext
+def images_backfill_command():
+    """Generate missing responsive derivatives for stored images."""
+    scanned, written = backfill_image_derivatives()
+    print(f"[IMAGES] Scanned {scanned} images, wrote {written} derivatives")
+
+
+@click.command('videos-backfill')
+@with_appcontext
+def videos_backfill_command():
+    """Transcode stored videos that are missing web variants (needs ffmpeg)."""
+    scanned, written = backfill_video_variants()
+    print(f"[VIDEOS] Scanned {scanned} videos, wrote {written} files")
+    if written:
+        page_cache.invalidate()
+
+
+@click.command('media-worker')
+@click.option('--once', is_flag=True, help='Exit when the queue is empty.')
+@click.option('--interval', default=2.0, help='Seconds between polls of an empty queue.')
+@click.option('--retry-failed', is_flag=True, help='Requeue jobs that ran out of attempts first.')
+@with_appcontext
+def media_worker_command(once, interval, retry_failed):
+    """Process queued media uploads and deletes."""
+    if retry_failed:
+        print(f"[JOBS] Requeued {retry_failed_jobs()} failed job(s)")
+    run_worker(on_change=page_cache.invalidate, poll_interval=interval, once=once)
+
+
+@click.command('compress-static')
+@with_appcontext
+def compress_static_command():
+    """Write .gz/.br siblings for static CSS/JS/SVG files (run before starting web)."""
+    scanned, written = precompress_static(current_app.static_folder)
+    print(f"[STATIC] Scanned {scanned} files, wrote {written} compressed siblings")
+
+
+@click.command('media-gc')
+@click.option('--dry-run', is_flag=True, help='Only report what would be deleted.')
+@click.option('--incremental', is_flag=True, help='Check a bounded slice and resume there next run.')
+@click.option('--limit', default=500, help='Items per source in incremental mode.')
+@click.option('--no-cloudinary', is_flag=True, help='Skip the Cloudinary listing.')
+@with_appcontext
+def media_gc_command(dry_run, incremental, limit, no_cloudinary):
+    """Delete stored media that no database row references."""
+    report = collect_media_garbage(dry_run=dry_run, incremental=incremental, limit=limit,
+                                   cloudinary=not no_cloudinary)
+    for orphan in report['orphans']:
+        status = 'FAILED' if orphan in report['failed'] else ('would delete' if dry_run else 'deleted')
+        print(f"[GC] {status}: {orphan.location}/{orphan.name} ({orphan.size} bytes)")
+    verb = 'Reclaimable' if dry_run else 'Reclaimed'
+    print(f"[GC] Scanned {report['scanned']}, orphans {len(report['orphans'])}, "
+          f"failed {len(report['failed'])}. {verb}: {report['reclaimed_bytes']} bytes")
+
+
+@click.command('migrate')
+@click.option('--status', 'show_status', is_flag=True, help='List migrations without applying them.')
+@with_appcontext
+def migrate_command(show_status):
+    """Apply pending database schema migrations."""
+    if show_status:
+        for version, name, applied in migration_status():
+            print(f"[MIGRATE] {version:>3} {'applied' if applied else 'pending'}  {name}")
+        return
+    applied = upgrade_schema()
+    if not applied:
+        print("[MIGRATE] Database schema is up to date")
+
+
+@click.command('check-indexes')
+@with_appcontext
+def check_indexes_command():
+    """Verify that page-view queries use their indexes (EXPLAIN)."""
+    failed = 0
+    for description, index, used, plan in check_indexes():
+        print(f"[PLAN] {'ok  ' if used else 'FAIL'} {description}: {index}")
+        if not used:
+            failed += 1
+            print('       ' + plan.replace('\n', '\n       '))
+    if failed:
+        raise SystemExit(1)
+
+
+@click.command('bootstrap')
+@with_appcontext
+def bootstrap_command():
+    """Apply migrations and seed default content (run once per deploy)."""
+    applied, seeded = bootstrap_database()
+    print(f"[BOOTSTRAP] {len(applied)} migration(s) applied, seeded: {', '.join(seeded) or 'nothing'}")
+    if seeded:
+        page_cache.invalidate()
+
+
+# Module-level app for gunicorn/flask (APP_ROLE picks the worker role)
+app = create_app(os.environ.get('APP_ROLE', 'all'))
+
+
 if __name__ == '__main__':
+    # The development server bootstraps its own database; in production
+    # this is the Procfile release step
+    with app.app_context():
+        bootstrap_database()
+
     port = int(os.environ.get('PORT', 5000))
     debug_mode = os.environ.get('FLASK_ENV') != 'production'
     app.run(host='0.0.0.0', port=port, debug=debug_mode)
\ No newline at end of file
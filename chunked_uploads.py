@@ -0,0 +1,169 @@
+"""
+Chunked Uploads
+Resumable uploads for files larger than MAX_CONTENT_LENGTH (hero videos).
+The dashboard creates an upload, PUTs the file in chunks with an
+Upload-Offset header and, after a dropped connection, asks for the offset
+to resume from. Chunks are streamed straight into a .part file in the
+instance folder, so memory use stays at one copy buffer whatever the size.
+"""
+
+import json
+import os
+import re
+import time
+import uuid
+from collections import namedtuple
+from flask import current_app
+from werkzeug.utils import secure_filename
+
+try:
+    import fcntl
+except ImportError:  # Windows development server: writes are not locked
+    fcntl = None
+
+# Bytes per PUT; must stay below MAX_CONTENT_LENGTH
+CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 5 * 1024 * 1024))
+MAX_UPLOAD_SIZE = int(os.environ.get('MAX_CHUNKED_UPLOAD_SIZE', 2 * 1024 ** 3))  # 2GB
+
+# Unfinished uploads are discarded after a day
+EXPIRY_SECONDS = 24 * 3600
+
+COPY_BUFFER = 64 * 1024
+UPLOAD_ID = re.compile(r'^[0-9a-f]{32}$')
+
+# offset is the number of bytes received so far
+Upload = namedtuple('Upload', ['id', 'path', 'filename', 'size', 'offset'])
+
+
+class UploadError(Exception):
+    """Rejected upload request; status is the HTTP status to answer with and
+    offset, when known, where the client should resume"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def upload_dir():
+    path = os.path.join(current_app.instance_path, 'chunked_uploads')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _paths(upload_id):
+    if not UPLOAD_ID.match(upload_id or ''):
+        raise UploadError('Unknown upload', 404)
+    base = os.path.join(upload_dir(), upload_id)
+    return f"{base}.part", f"{base}.json"
+
+
+def create_upload(filename, size):
+    """
+    Start a new upload
+
+    Returns:
+        Upload: with offset 0
+    """
+    if not filename or not secure_filename(filename):
+        raise UploadError('Missing filename')
+    if not isinstance(size, int) or size <= 0:
+        raise UploadError('Missing file size')
+    if size > MAX_UPLOAD_SIZE:
+        raise UploadError(f'File is too large. Maximum upload size is {MAX_UPLOAD_SIZE // 1024 ** 2}MB.', 413)
+
+    prune_expired()
+    upload_id = uuid.uuid4().hex
+    part_path, meta_path = _paths(upload_id)
+    open(part_path, 'wb').close()
+    with open(meta_path, 'w') as f:
+        json.dump({'filename': filename, 'size': size}, f)
+    return Upload(upload_id, part_path, filename, size, 0)
+
+
+def get_upload(upload_id):
+    """The upload and how much of it has arrived (raises UploadError if unknown)"""
+    part_path, meta_path = _paths(upload_id)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        offset = os.path.getsize(part_path)
+    except (FileNotFoundError, ValueError):
+        raise UploadError('Unknown upload', 404)
+    return Upload(upload_id, part_path, meta['filename'], meta['size'], offset)
+
+
+def _lock(f):
+    """Try to take the per-upload write lock (released when f is closed)"""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def write_chunk(upload_id, offset, stream):
+    """
+    Write the bytes of one request body at offset
+
+    Whatever arrives before a dropped connection is kept, so the client
+    can resume from the returned/queried offset. The offset check and the
+    write happen under a per-upload lock, so a retry that arrives while the
+    first attempt is still being read gets a 409 instead of appending twice.
+
+    Returns:
+        Upload: with the new offset
+    """
+    upload = get_upload(upload_id)
+    with open(upload.path, 'r+b') as out:
+        if not _lock(out):
+            raise UploadError('This upload is being written by another request', 409, upload.offset)
+        current = os.fstat(out.fileno()).st_size
+        if offset != current:
+            # Client and server disagree (e.g. a retried chunk): tell it where to resume
+            raise UploadError(f'Expected offset {current}', 409, current)
+
+        out.seek(offset)
+        remaining = upload.size - offset
+        while True:
+            chunk = stream.read(COPY_BUFFER)
+            if not chunk:
+                break
+            if len(chunk) > remaining:
+                raise UploadError('More data than the declared file size', 413, upload.size - remaining)
+            out.write(chunk)
+            remaining -= len(chunk)
+    return get_upload(upload_id)
+
+
+def finished_upload(upload_id):
+    """The upload if every byte has arrived, else None"""
+    if not upload_id:
+        return None
+    try:
+        upload = get_upload(upload_id)
+    except UploadError:
+        return None
+    return upload if upload.offset == upload.size else None
+
+
+def discard_upload(upload_id):
+    """Delete an upload's files (after it was moved into storage, or aborted)"""
+    for path in _paths(upload_id):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def prune_expired():
+    """Delete uploads nobody has written to for EXPIRY_SECONDS"""
+    cutoff = time.time() - EXPIRY_SECONDS
+    directory = upload_dir()
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            pass  # Pruned by a concurrent request
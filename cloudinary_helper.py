@@ -1,38 +1,94 @@
 """
 Cloudinary Helper Module
 Handles all Cloudinary uploads and deletions
+
+The Cloudinary SDK is only imported on the first upload or delete, so
+processes that never touch media (e.g. public web workers) skip loading it.
 """
 
 import os
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
+from collections import namedtuple
+from importlib.util import find_spec
 
-def is_cloudinary_configured():
-    """Check if Cloudinary environment variables are set"""
+class StorageBackend(namedtuple('StorageBackend', ['cloudinary', 'cloud_name', 'api_key', 'api_secret', 'reason'])):
+    """Resolved media storage configuration (immutable); the SDK is configured from it"""
+    __slots__ = ()
+
+    def __repr__(self):
+        # Keep credentials out of logs and tracebacks
+        return f"StorageBackend(cloudinary={self.cloudinary!r}, cloud_name={self.cloud_name!r}, reason={self.reason!r})"
+
+
+# Resolved once on first use; call reload_storage_backend() after changing env vars
+_storage_backend = None
+
+# Set once the SDK has been imported and configured for _storage_backend
+_sdk_configured = False
+
+
+def _resolve_storage_backend():
+    """Read Cloudinary environment variables (without importing the SDK)"""
     cloud_name = os.getenv('CLOUDINARY_CLOUD_NAME')
     api_key = os.getenv('CLOUDINARY_API_KEY')
     api_secret = os.getenv('CLOUDINARY_API_SECRET')
 
     if not all([cloud_name, api_key, api_secret]):
-        print("[CLOUDINARY] Not configured - missing environment variables")
-        return False
+        return StorageBackend(False, None, None, None, 'missing environment variables')
 
     # Check if values are still placeholders
     if cloud_name == 'your_cloud_name' or api_key == 'your_api_key':
-        print("[CLOUDINARY] Not configured - placeholder values detected")
-        return False
+        return StorageBackend(False, None, None, None, 'placeholder values detected')
+
+    if find_spec('cloudinary') is None:
+        return StorageBackend(False, None, None, None, 'cloudinary package not installed')
+
+    return StorageBackend(True, cloud_name, api_key, api_secret, None)
+
+
+def _sdk():
+    """Import and configure the Cloudinary SDK on first use"""
+    global _sdk_configured
+    import cloudinary
+    import cloudinary.api
+    import cloudinary.uploader
+
+    if not _sdk_configured:
+        # Configure Cloudinary from the resolved backend, not the environment,
+        # so the SDK always matches what is_cloudinary_configured() reported
+        backend = get_storage_backend()
+        cloudinary.config(
+            cloud_name=backend.cloud_name,
+            api_key=backend.api_key,
+            api_secret=backend.api_secret,
+            secure=True
+        )
+        _sdk_configured = True
+    return cloudinary
+
+
+def reload_storage_backend():
+    """Re-read the Cloudinary configuration and return the new backend"""
+    global _storage_backend, _sdk_configured
+    _storage_backend = _resolve_storage_backend()
+    _sdk_configured = False
+
+    if _storage_backend.cloudinary:
+        print(f"[CLOUDINARY] Configured successfully with cloud: {_storage_backend.cloud_name}")
+    else:
+        print(f"[CLOUDINARY] Not configured - {_storage_backend.reason}")
+    return _storage_backend
 
-    # Configure Cloudinary
-    cloudinary.config(
-        cloud_name=cloud_name,
-        api_key=api_key,
-        api_secret=api_secret,
-        secure=True
-    )
 
-    print(f"[CLOUDINARY] Configured successfully with cloud: {cloud_name}")
-    return True
+def get_storage_backend():
+    """Return the storage backend, resolving it on first use"""
+    if _storage_backend is None:
+        return reload_storage_backend()
+    return _storage_backend
+
+
+def is_cloudinary_configured():
+    """Check if Cloudinary is configured (resolved once, then cached)"""
+    return get_storage_backend().cloudinary
 
 
 def upload_image(file, folder='altius-biotech'):
@@ -54,7 +110,7 @@ def upload_image(file, folder='altius-biotech'):
         print(f"[CLOUDINARY] Uploading to folder: {folder}")
 
         # Upload to Cloudinary
-        result = cloudinary.uploader.upload(
+        result = _sdk().uploader.upload(
             file,
             folder=folder,
             resource_type='image',
@@ -96,7 +152,7 @@ def upload_video(file, folder='altius-biotech'):
         print(f"[CLOUDINARY] Uploading video to folder: {folder}")
 
         # Upload to Cloudinary
-        result = cloudinary.uploader.upload(
+        result = _sdk().uploader.upload(
             file,
             folder=folder,
             resource_type='video',
@@ -136,24 +192,11 @@ def delete_file(url):
         return False
 
     try:
-        # Extract public_id from URL
-        # URL format: https://res.cloudinary.com/cloud_name/image/upload/v123456/folder/file.jpg
-        parts = url.split('/')
-
-        # Find the index of 'upload'
-        upload_index = parts.index('upload')
-
-        # Everything after 'upload/vXXXXXX/' is the public_id (without extension)
-        public_id_parts = parts[upload_index + 2:]  # Skip 'upload' and version
-        public_id_with_ext = '/'.join(public_id_parts)
-
-        # Remove file extension
-        public_id = public_id_with_ext.rsplit('.', 1)[0]
-
+        public_id = public_id_from_url(url)
         print(f"[CLOUDINARY] Deleting public_id: {public_id}")
 
         # Delete from Cloudinary
-        result = cloudinary.uploader.destroy(public_id)
+        result = _sdk().uploader.destroy(public_id, resource_type=resource_type_from_url(url))
 
         success = result.get('result') == 'ok'
         print(f"[CLOUDINARY] Delete result: {result}")
@@ -162,3 +205,102 @@ def delete_file(url):
     except Exception as e:
         print(f"[CLOUDINARY] Delete error: {e}")
         return False
+
+
+def public_id_from_url(url):
+    """
+    Extract the public_id from a Cloudinary delivery URL
+
+    URL format: https://res.cloudinary.com/cloud_name/image/upload/v123456/folder/file.jpg
+    """
+    parts = url.split('/')
+
+    # Find the index of 'upload'
+    upload_index = parts.index('upload')
+
+    # Everything after 'upload/vXXXXXX/' is the public_id (without extension)
+    public_id_parts = parts[upload_index + 2:]  # Skip 'upload' and version
+    public_id_with_ext = '/'.join(public_id_parts)
+
+    # Remove file extension
+    return public_id_with_ext.rsplit('.', 1)[0]
+
+
+def resource_type_from_url(url):
+    """'image' or 'video' (the path segment before /upload/)"""
+    parts = url.split('/')
+    return parts[parts.index('upload') - 1]
+
+
+# Admin API limit on public_ids per delete_resources call
+DELETE_BATCH_SIZE = 100
+
+
+def delete_files(urls):
+    """
+    Delete many files from Cloudinary with bulk Admin API requests
+
+    public_ids are grouped by resource type and deleted up to
+    DELETE_BATCH_SIZE per request. Files that are already gone count
+    as deleted.
+
+    Args:
+        urls: Cloudinary URLs
+
+    Returns:
+        list: URLs that could not be deleted (empty on full success)
+    """
+    if not is_cloudinary_configured():
+        return list(urls)
+
+    batches = {}
+    failed = []
+    for url in urls:
+        try:
+            batches.setdefault(resource_type_from_url(url), {})[public_id_from_url(url)] = url
+        except (ValueError, IndexError):
+            print(f"[CLOUDINARY] Not a Cloudinary URL: {url}")
+            failed.append(url)
+
+    for resource_type, by_public_id in batches.items():
+        for public_id in delete_public_ids(list(by_public_id), resource_type):
+            failed.append(by_public_id[public_id])
+
+    return failed
+
+
+def delete_public_ids(public_ids, resource_type='image'):
+    """
+    Bulk-delete public_ids of one resource type
+
+    Returns:
+        list: public_ids that could not be deleted
+    """
+    failed = []
+    for start in range(0, len(public_ids), DELETE_BATCH_SIZE):
+        chunk = public_ids[start:start + DELETE_BATCH_SIZE]
+        print(f"[CLOUDINARY] Deleting {len(chunk)} {resource_type} file(s)")
+        try:
+            result = _sdk().api.delete_resources(chunk, resource_type=resource_type)
+            deleted = result.get('deleted', {})
+        except Exception as e:
+            print(f"[CLOUDINARY] Bulk delete error: {e}")
+            deleted = {}
+        failed.extend(public_id for public_id in chunk
+                      if deleted.get(public_id) not in ('deleted', 'not_found'))
+    return failed
+
+
+def list_resources(prefix, resource_type='image', next_cursor=None, max_results=500):
+    """
+    One page of uploaded resources under a folder prefix
+
+    Returns:
+        tuple: (list of {'public_id', 'bytes', 'created_at'}, next_cursor or None)
+    """
+    options = {'type': 'upload', 'prefix': prefix, 'resource_type': resource_type,
+               'max_results': max_results}
+    if next_cursor:
+        options['next_cursor'] = next_cursor
+    result = _sdk().api.resources(**options)
+    return result.get('resources', []), result.get('next_cursor')
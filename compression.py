@@ -0,0 +1,176 @@
+"""
+Response Compression
+gzip/brotli for responses, since gunicorn serves the app with no proxy in
+front:
+    dynamic   HTML/XML/JSON/text responses above COMPRESS_MIN_SIZE are
+              compressed in an after_request hook; bodies with an ETag
+              (the cached homepage) are compressed once per version
+    static    `flask --app app compress-static` writes .gz/.br siblings
+              next to CSS/JS/SVG files, and the static view sends the best
+              sibling the browser accepts with no per-request compression
+Brotli needs the optional 'brotli' package; without it only gzip is used.
+"""
+
+import gzip
+import mimetypes
+import os
+from importlib.util import find_spec
+from flask import current_app, request, send_from_directory
+from werkzeug.security import safe_join
+
+# brotli is imported on first use
+HAS_BROTLI = find_spec('brotli') is not None
+
+# Smaller bodies are not worth a Content-Encoding (and may even grow)
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/xml', 'text/javascript',
+    'application/json', 'application/xml', 'application/javascript', 'image/svg+xml',
+}
+STATIC_EXTENSIONS = {'css', 'js', 'svg', 'json', 'xml', 'txt', 'html', 'map'}
+
+# encoding -> sibling suffix, most preferred first
+SIBLINGS = {'br': '.br', 'gzip': '.gz'}
+
+# Fast levels per request, maximum levels for the one-off static build
+DYNAMIC_LEVELS = {'br': 4, 'gzip': 6}
+STATIC_LEVELS = {'br': 11, 'gzip': 9}
+
+# (etag, encoding) -> compressed body
+_compressed = {}
+MAX_CACHED_BODIES = 64
+
+
+def available_encodings():
+    return [encoding for encoding in SIBLINGS if encoding != 'br' or HAS_BROTLI]
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        import brotli
+        return brotli.compress(data, quality=level)
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def negotiate(encodings):
+    """Best of encodings that the request's Accept-Encoding allows, or None"""
+    accepted = request.accept_encodings
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = accepted.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_response(response):
+    """after_request hook: compress eligible dynamic responses"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES
+            or 'no-transform' in response.headers.get('Cache-Control', '')):
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    # The response differs by Accept-Encoding from here on, compressed or not
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(available_encodings())
+    if encoding is None:
+        return response
+
+    etag, weak = response.get_etag()
+    key = (etag, encoding)
+    body = _compressed.get(key) if etag else None
+    if body is None:
+        body = compress(data, encoding, DYNAMIC_LEVELS[encoding])
+        if etag:
+            if len(_compressed) >= MAX_CACHED_BODIES:
+                _compressed.clear()
+            _compressed[key] = body
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if etag and not weak:
+        # Same content, different bytes: a weak validator still matches
+        # If-None-Match, so 304s keep working
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def is_compressible_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in STATIC_EXTENSIONS
+
+
+def fresh_sibling(path, suffix):
+    """True if path + suffix exists and is not older than path"""
+    try:
+        return os.stat(path + suffix).st_mtime_ns >= os.stat(path).st_mtime_ns
+    except OSError:
+        return False
+
+
+def send_static_file(filename):
+    """
+    Static view: a precompressed sibling when one is fresh and accepted,
+    otherwise the file itself (same caching and conditional handling)
+    """
+    static_folder = current_app.static_folder
+    max_age = current_app.get_send_file_max_age(filename)
+    encodings = []
+    if is_compressible_file(filename):
+        path = safe_join(static_folder, filename)
+        if path and os.path.isfile(path):
+            encodings = [encoding for encoding in available_encodings()
+                         if fresh_sibling(path, SIBLINGS[encoding])]
+
+    encoding = negotiate(encodings) if encodings else None
+    if encoding:
+        response = send_from_directory(static_folder, filename + SIBLINGS[encoding],
+                                       mimetype=mimetypes.guess_type(filename)[0],
+                                       conditional=True, max_age=max_age)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_from_directory(static_folder, filename, max_age=max_age)
+    if encodings:
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def precompress_static(static_folder, min_size=COMPRESS_MIN_SIZE):
+    """
+    Write .gz (and .br) siblings for compressible static files
+
+    Siblings newer than their source are kept, so this is cheap to re-run
+    on every start.
+
+    Returns:
+        tuple: (files scanned, siblings written)
+    """
+    scanned = written = 0
+    for directory, _, filenames in os.walk(static_folder):
+        for filename in sorted(filenames):
+            if not is_compressible_file(filename):
+                continue
+            path = os.path.join(directory, filename)
+            if os.path.getsize(path) < min_size:
+                continue
+            scanned += 1
+            data = None
+            for encoding in available_encodings():
+                suffix = SIBLINGS[encoding]
+                if fresh_sibling(path, suffix):
+                    continue
+                if data is None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                tmp_path = f"{path}{suffix}.tmp"
+                with open(tmp_path, 'wb') as out:
+                    out.write(compress(data, encoding, STATIC_LEVELS[encoding]))
+                os.replace(tmp_path, path + suffix)
+                written += 1
+    return scanned, written
@@ -0,0 +1,222 @@
+"""
+Content History Module
+Stores ContentHistory snapshots as field-level diffs against periodic
+compressed keyframes, and reconstructs any version for rollback.
+
+content_snapshot formats (JSON):
+    legacy:   {"hero_label": ..., ...}                   full snapshot (keyframe)
+    keyframe: {"v": 2, "type": "keyframe", "data": ...}  base64(zlib(full JSON))
+    delta:    {"v": 2, "type": "delta", "fields": {...}} fields that differ from
+                                                         the previous entry (by id)
+"""
+
+import base64
+import json
+import os
+import zlib
+from datetime import datetime
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import defer
+from models import db, ContentHistory
+
+# Content fields captured in each snapshot
+SNAPSHOT_FIELDS = [
+    'hero_label', 'hero_title', 'hero_description',
+    'stat1_number', 'stat1_text', 'stat2_number', 'stat2_text',
+    'features_label', 'features_title', 'features_description',
+    'products_label', 'products_title', 'products_description',
+    'contact_tagline', 'contact_title', 'contact_description',
+    'contact_phone', 'contact_email', 'contact_address',
+    'company_name', 'company_tagline', 'footer_text',
+]
+
+# A keyframe is written at least every KEYFRAME_INTERVAL entries, which
+# bounds how many rows a reconstruction has to read
+KEYFRAME_INTERVAL = int(os.environ.get('HISTORY_KEYFRAME_INTERVAL', 10))
+
+# Oldest entries beyond this count are compacted away (0 keeps everything)
+MAX_ENTRIES = int(os.environ.get('HISTORY_MAX_ENTRIES', 200))
+
+# Entries shown per page of the admin history view
+PAGE_SIZE = int(os.environ.get('HISTORY_PAGE_SIZE', 20))
+
+
+def content_state(content):
+    """Current values of the snapshot fields"""
+    return {field: getattr(content, field) for field in SNAPSHOT_FIELDS}
+
+
+def encode_keyframe(state):
+    data = zlib.compress(json.dumps(state).encode('utf-8'), 9)
+    return json.dumps({'v': 2, 'type': 'keyframe', 'data': base64.b64encode(data).decode('ascii')})
+
+
+def encode_delta(changes):
+    return json.dumps({'v': 2, 'type': 'delta', 'fields': changes})
+
+
+def decode(entry):
+    """Return ('keyframe', full state) or ('delta', changed fields) for an entry"""
+    raw = json.loads(entry.content_snapshot)
+    if raw.get('v') != 2:
+        return 'keyframe', raw  # Legacy full snapshot
+    if raw['type'] == 'keyframe':
+        return 'keyframe', json.loads(zlib.decompress(base64.b64decode(raw['data'])).decode('utf-8'))
+    return 'delta', raw['fields']
+
+
+def _reconstruct(entry):
+    """Full state of an entry plus the number of deltas applied to reach it"""
+    # Walk back to the nearest keyframe, a bounded number of rows at a time
+    chain = []
+    cursor_id = entry.id
+    while True:
+        rows = (ContentHistory.query
+                .filter(ContentHistory.id <= cursor_id)
+                .order_by(ContentHistory.id.desc())
+                .limit(KEYFRAME_INTERVAL + 1)
+                .all())
+        if not rows:
+            raise ValueError(f"History entry {entry.id} has no keyframe")
+        for row in rows:
+            kind, data = decode(row)
+            if kind == 'keyframe':
+                state = dict(data)
+                for fields in reversed(chain):
+                    state.update(fields)
+                return state, len(chain)
+            chain.append(data)
+        cursor_id = rows[-1].id - 1
+
+
+def load_snapshot(entry):
+    """Reconstruct the full content snapshot stored by a history entry"""
+    return _reconstruct(entry)[0]
+
+
+def create_snapshot(content, description):
+    """
+    Record the current content state as a new history entry
+
+    Returns:
+        ContentHistory: the new (flushed, uncommitted) entry
+    """
+    state = content_state(content)
+    previous = ContentHistory.query.order_by(ContentHistory.id.desc()).first()
+
+    encoded = None
+    if previous is not None:
+        previous_state, depth = _reconstruct(previous)
+        if depth + 1 < KEYFRAME_INTERVAL:
+            changes = {k: v for k, v in state.items() if previous_state.get(k) != v}
+            encoded = encode_delta(changes)
+    if encoded is None:
+        encoded = encode_keyframe(state)
+
+    history = ContentHistory(content_snapshot=encoded, description=description)
+    db.session.add(history)
+    db.session.flush()
+    compact()
+    return history
+
+
+def delete_entry(entry):
+    """Delete a history entry without breaking the delta chain after it"""
+    following = (ContentHistory.query
+                 .filter(ContentHistory.id > entry.id)
+                 .order_by(ContentHistory.id)
+                 .first())
+    if following is not None and decode(following)[0] == 'delta':
+        # The next entry was a diff against this one: store it in full
+        following.content_snapshot = encode_keyframe(load_snapshot(following))
+    db.session.delete(entry)
+
+
+def compact(max_entries=MAX_ENTRIES):
+    """
+    Retention policy: keep only the newest max_entries history rows
+
+    The oldest surviving row is rewritten as a keyframe first, so the
+    table size tracks the configured retention rather than edit volume.
+
+    Returns:
+        int: number of rows deleted
+    """
+    if not max_entries:
+        return 0
+    total = ContentHistory.query.count()
+    excess = total - max_entries
+    if excess <= 0:
+        return 0
+
+    oldest_kept = (ContentHistory.query
+                   .order_by(ContentHistory.id)
+                   .offset(excess)
+                   .first())
+    if decode(oldest_kept)[0] == 'delta':
+        oldest_kept.content_snapshot = encode_keyframe(load_snapshot(oldest_kept))
+    deleted = (ContentHistory.query
+               .filter(ContentHistory.id < oldest_kept.id)
+               .delete(synchronize_session=False))
+    return deleted
+
+
+def encode_cursor(entry):
+    """Opaque page cursor '<created_at>_<id>' pointing just past entry"""
+    return f"{entry.created_at.isoformat()}_{entry.id}"
+
+
+def parse_cursor(cursor):
+    """(created_at, id) from encode_cursor(), or None if missing/invalid"""
+    try:
+        created_at, entry_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(created_at), int(entry_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def history_page(cursor=None, per_page=PAGE_SIZE):
+    """
+    One page of history entries, newest first
+
+    Keyset pagination on (created_at, id): each page continues after the
+    last row of the previous one instead of using OFFSET, so old pages are
+    as cheap as the first. Snapshot bodies are deferred and only loaded
+    when an entry is actually diffed or restored.
+
+    Args:
+        cursor: value from encode_cursor() of the last entry shown, or None
+        per_page: page size
+
+    Returns:
+        tuple: (entries, cursor for the next page or None)
+    """
+    query = ContentHistory.query.options(defer(ContentHistory.content_snapshot))
+    position = parse_cursor(cursor)
+    if position is not None:
+        created_at, entry_id = position
+        query = query.filter(or_(
+            ContentHistory.created_at < created_at,
+            and_(ContentHistory.created_at == created_at, ContentHistory.id < entry_id),
+        ))
+
+    rows = (query
+            .order_by(ContentHistory.created_at.desc(), ContentHistory.id.desc())
+            .limit(per_page + 1)
+            .all())
+    entries = rows[:per_page]
+    next_cursor = encode_cursor(entries[-1]) if len(rows) > per_page else None
+    return entries, next_cursor
+
+
+def diff_snapshot(entry, state):
+    """
+    Fields where a history entry differs from a content state
+
+    Returns:
+        list of dicts with 'field', 'version' (entry value) and 'current'
+    """
+    snapshot = load_snapshot(entry)
+    return [{'field': field, 'version': snapshot.get(field), 'current': state.get(field)}
+            for field in SNAPSHOT_FIELDS
+            if field in snapshot and snapshot.get(field) != state.get(field)]
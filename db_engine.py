@@ -0,0 +1,88 @@
+"""
+Database Engine Options
+Builds SQLALCHEMY_ENGINE_OPTIONS from environment variables. Pool sizes
+default to what one gunicorn worker can actually use (its thread count),
+capped so all workers together stay within the database connection limit.
+
+    DB_POOL_SIZE            persistent connections per worker process
+    DB_MAX_OVERFLOW         extra connections allowed during spikes
+    DB_POOL_TIMEOUT         seconds to wait for a free connection
+    DB_POOL_RECYCLE         seconds before a connection is replaced
+    DB_POOL_PRE_PING        test connections before use (True/False)
+    DB_STATEMENT_TIMEOUT_MS PostgreSQL statement_timeout (0 disables)
+    DB_MAX_CONNECTIONS      connection budget shared by all workers
+    WEB_CONCURRENCY         gunicorn worker processes
+    GUNICORN_THREADS        threads per gunicorn worker
+"""
+
+import os
+
+
+def _int(environ, name, default):
+    value = environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def engine_options(database_url, environ=os.environ):
+    """
+    Engine options for a database URL
+
+    Args:
+        database_url: SQLAlchemy URL (already rewritten to postgresql://)
+        environ: mapping to read settings from
+
+    Returns:
+        dict: value for app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    """
+    if database_url.startswith('sqlite'):
+        # Local file database: SQLAlchemy's own pool defaults are fine
+        return {}
+
+    workers = max(1, _int(environ, 'WEB_CONCURRENCY', 1))
+    threads = max(1, _int(environ, 'GUNICORN_THREADS', 1))
+
+    pool_size = _int(environ, 'DB_POOL_SIZE', threads)
+    max_overflow = _int(environ, 'DB_MAX_OVERFLOW', threads)
+
+    # Keep workers * (pool_size + max_overflow) within the shared budget
+    budget = _int(environ, 'DB_MAX_CONNECTIONS', 0)
+    if budget:
+        per_worker = max(1, budget // workers)
+        pool_size = min(pool_size, per_worker)
+        max_overflow = min(max_overflow, per_worker - pool_size)
+
+    options = {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': _int(environ, 'DB_POOL_TIMEOUT', 10),
+        # Below common proxy/PaaS idle cutoffs, so stale sockets are rare
+        'pool_recycle': _int(environ, 'DB_POOL_RECYCLE', 300),
+        # Catches connections dropped while idle before a request uses them
+        'pool_pre_ping': environ.get('DB_POOL_PRE_PING', 'True') == 'True',
+    }
+
+    statement_timeout = _int(environ, 'DB_STATEMENT_TIMEOUT_MS', 15000)
+    if statement_timeout and database_url.startswith('postgresql'):
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
+
+def pool_stats(engine):
+    """
+    Current pool usage for one engine (this worker process only)
+
+    Returns:
+        dict with the pool class, counters where the pool supports them,
+        and SQLAlchemy's status line
+    """
+    pool = engine.pool
+    stats = {'pool': type(pool).__name__, 'status': pool.status()}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        counter = getattr(pool, name, None)
+        if callable(counter):
+            stats[name] = counter()
+    # Effective settings (SQLAlchemy keeps these as private attributes)
+    stats['timeout'] = getattr(pool, '_timeout', None)
+    stats['recycle'] = getattr(pool, '_recycle', None)
+    stats['pre_ping'] = getattr(pool, '_pre_ping', None)
+    return stats
@@ -0,0 +1,79 @@
+"""
+Read Replica Routing
+With DATABASE_REPLICA_URL set, reads made while serving public GET
+requests go to the replica engine; admin routes, flushes and everything
+outside a request use the primary.
+
+Replication lag is handled twice:
+    - read-your-writes: a browser session that committed a write in the
+      last REPLICA_LAG_SECONDS keeps reading from the primary
+    - cache safety: for REPLICA_LAG_SECONDS after any page-cache
+      invalidation every public request reads from the primary, so pages
+      cached under the new version never come from a lagging replica
+
+Two SQLite files work as primary/replica for local testing (copy the
+primary file over the replica to "replicate").
+"""
+
+import os
+import time
+from flask import g, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from db_engine import engine_options
+
+REPLICA_BIND = 'replica'
+
+# Upper bound on replica lag we are willing to assume
+REPLICA_LAG_SECONDS = float(os.environ.get('REPLICA_LAG_SECONDS', 10))
+
+# Flask session key holding the time of this browser's last committed write
+LAST_WRITE_KEY = 'db_last_write'
+
+
+class RoutingSession(Session):
+    """db.session class that sends replica-eligible reads to the replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and reading_from_replica():
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _note_commit(db_session):
+    if has_request_context():
+        g.db_committed = True
+
+
+def reading_from_replica():
+    return has_request_context() and g.get('use_replica', False)
+
+
+def replica_binds(replica_url):
+    """SQLALCHEMY_BINDS entry for the replica (empty when not configured)"""
+    if not replica_url:
+        return {}
+    return {REPLICA_BIND: dict(engine_options(replica_url), url=replica_url)}
+
+
+def recently_written(changed_at=None):
+    """
+    True if the replica may not have the latest writes yet
+
+    Args:
+        changed_at: time of the last shared-cache invalidation, if known
+    """
+    now = time.time()
+    if now - session.get(LAST_WRITE_KEY, 0) < REPLICA_LAG_SECONDS:
+        return True
+    return changed_at is not None and now - changed_at < REPLICA_LAG_SECONDS
+
+
+def remember_write(response):
+    """after_request hook: start the read-your-writes window for this session"""
+    if g.get('db_committed'):
+        session[LAST_WRITE_KEY] = time.time()
+    return response
@@ -0,0 +1,105 @@
+"""
+Gallery Upload Module
+Uploads product gallery images concurrently through a bounded thread pool
+"""
+
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Result for one gallery file; url is None when the upload failed
+GalleryUpload = namedtuple('GalleryUpload', ['order', 'filename', 'url', 'error'])
+
+DEFAULT_MAX_WORKERS = int(os.environ.get('GALLERY_UPLOAD_WORKERS', 4))
+
+
+class CloudinaryUploader:
+    """Uploads gallery files to a Cloudinary folder"""
+
+    def __init__(self, upload_image, folder='altius-biotech/products'):
+        self.upload_image = upload_image
+        self.folder = folder
+
+    def __call__(self, file, order):
+        return self.upload_image(file, folder=self.folder)
+
+
+class LocalUploader:
+    """Saves gallery files into the content-addressed media store"""
+
+    def __init__(self, folder='products'):
+        self.folder = folder
+
+    def __call__(self, file, order):
+        from media_store import store_upload
+        return store_upload(file, self.folder)
+
+
+class FakeUploader:
+    """Offline stand-in for Cloudinary with a fixed latency (benchmarks/tests)"""
+
+    def __init__(self, latency=0.2, fail=()):
+        self.latency = latency
+        self.fail = set(fail)
+
+    def __call__(self, file, order):
+        time.sleep(self.latency)
+        if file.filename in self.fail:
+            return None
+        return f"https://res.cloudinary.com/fake/image/upload/v1/altius-biotech/products/{order}_{file.filename}"
+
+
+def upload_gallery(files, uploader, start_order=1, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Upload gallery files concurrently
+
+    Args:
+        files: FileStorage objects in the order the admin selected them
+        uploader: callable(file, order) returning the stored URL/filename or None
+        start_order: display order given to the first file
+        max_workers: upper bound on concurrent uploads
+
+    Returns:
+        tuple: (uploaded, failed) lists of GalleryUpload, both sorted by order.
+        Orders are assigned from the input position, never from completion order.
+    """
+    jobs = [(start_order + idx, f) for idx, f in enumerate(files)]
+    if not jobs:
+        return [], []
+
+    def run(job):
+        order, file = job
+        try:
+            url = uploader(file, order)
+        except Exception as e:
+            return GalleryUpload(order, file.filename, None, str(e))
+        if not url:
+            return GalleryUpload(order, file.filename, None, 'upload failed')
+        return GalleryUpload(order, file.filename, url, None)
+
+    workers = max(1, min(max_workers, len(jobs)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(run, jobs))
+
+    uploaded = [r for r in results if r.url]
+    failed = [r for r in results if not r.url]
+    return uploaded, failed
+
+
+if __name__ == '__main__':
+    # Offline benchmark: python gallery_uploads.py [files] [latency]
+    import sys
+    from io import BytesIO
+    from werkzeug.datastructures import FileStorage
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    files = [FileStorage(BytesIO(b'x'), filename=f'photo_{i}.jpg') for i in range(count)]
+    uploader = FakeUploader(latency=latency)
+
+    for workers in (1, DEFAULT_MAX_WORKERS):
+        started = time.perf_counter()
+        uploaded, failed = upload_gallery(files, uploader, max_workers=workers)
+        elapsed = time.perf_counter() - started
+        print(f"{count} files, {workers} worker(s): {elapsed:.2f}s ({len(uploaded)} ok, {len(failed)} failed)")
@@ -0,0 +1,187 @@
+"""
+Image Pipeline
+Generates resized JPEG/PNG and WebP derivatives of locally stored product
+and feature images, and builds srcset data for the templates.
+Derivatives live next to the originals in a 'derived' subfolder:
+    static/images/products/derived/<stem>-<width>w.<ext>
+Pillow is optional; without it images are served as uploaded.
+"""
+
+import os
+from importlib.util import find_spec
+from flask import url_for
+
+# Pillow is imported on first use (only the media worker resizes images)
+HAS_PILLOW = find_spec('PIL') is not None
+
+DERIVATIVE_WIDTHS = (320, 640, 1024)
+DERIVED_DIR = 'derived'
+IMAGE_FOLDERS = ('products', 'features')
+
+# Originals in these formats get a same-format derivative next to the WebP ones
+FALLBACK_FORMATS = {'jpg': 'JPEG', 'jpeg': 'JPEG', 'png': 'PNG', 'webp': 'WEBP'}
+
+# path -> intrinsic width of an original (stored files never change in place)
+_widths = {}
+
+
+def derivative_path(original_path, width, ext):
+    directory, filename = os.path.split(original_path)
+    stem = filename.rsplit('.', 1)[0]
+    return os.path.join(directory, DERIVED_DIR, f"{stem}-{width}w.{ext}")
+
+
+def derivative_paths(original_path):
+    """Every derivative path that may exist for an original"""
+    ext = original_path.rsplit('.', 1)[-1].lower()
+    paths = []
+    for width in DERIVATIVE_WIDTHS:
+        paths.append(derivative_path(original_path, width, 'webp'))
+        if ext in FALLBACK_FORMATS and ext != 'webp':
+            paths.append(derivative_path(original_path, width, ext))
+    return paths
+
+
+def generate_derivatives(original_path):
+    """
+    Create resized derivatives for one image
+
+    Only widths smaller than the original are generated, and existing
+    derivatives are left alone, so this is safe to re-run. GIFs and other
+    animated images are skipped: a resized first frame would replace the
+    animation in browsers that prefer the WebP <source>.
+
+    Returns:
+        int: number of derivative files written
+    """
+    ext = original_path.rsplit('.', 1)[-1].lower()
+    if not HAS_PILLOW or ext == 'gif' or not os.path.exists(original_path):
+        return 0
+    from PIL import Image, ImageOps
+
+    written = 0
+    with Image.open(original_path) as img:
+        if getattr(img, 'is_animated', False):
+            return 0
+        img = ImageOps.exif_transpose(img)
+        for width in DERIVATIVE_WIDTHS:
+            if width >= img.width:
+                break
+            height = round(img.height * width / img.width)
+            resized = None
+
+            targets = [('webp', 'WEBP')]
+            if ext in FALLBACK_FORMATS and ext != 'webp':
+                targets.append((ext, FALLBACK_FORMATS[ext]))
+
+            for target_ext, target_format in targets:
+                path = derivative_path(original_path, width, target_ext)
+                if os.path.exists(path):
+                    continue
+                if resized is None:
+                    resized = img.resize((width, height), Image.LANCZOS)
+                frame = resized
+                if target_format == 'JPEG' and frame.mode not in ('RGB', 'L'):
+                    frame = frame.convert('RGB')
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                frame.save(path, target_format, quality=82, optimize=True)
+                written += 1
+    return written
+
+
+def remove_image(original_path):
+    """Delete a local image together with its derivatives"""
+    for path in [original_path] + derivative_paths(original_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def image_width(path):
+    """Intrinsic width of a stored image as displayed (None if unknown)"""
+    if path not in _widths:
+        if not HAS_PILLOW:
+            return None
+        from PIL import Image
+        try:
+            # Only the header is read; EXIF rotation may swap width and height
+            with Image.open(path) as img:
+                orientation = img.getexif().get(0x0112, 1)
+                _widths[path] = img.height if orientation in (5, 6, 7, 8) else img.width
+        except OSError:
+            return None
+    return _widths[path]
+
+
+def cloudinary_variant(url, width):
+    """Cloudinary URL resized on the fly (f_auto picks WebP/AVIF per browser)"""
+    if '/upload/' not in url:
+        return url
+    return url.replace('/upload/', f'/upload/c_limit,w_{width},f_auto,q_auto/', 1)
+
+
+def responsive_image(value, folder):
+    """
+    Template helper: src and srcset data for a stored image
+
+    Args:
+        value: Cloudinary URL or local filename from the database
+        folder: 'products' or 'features'
+
+    Returns:
+        dict with 'src', 'srcset' and 'webp_srcset' (empty when no variants)
+    """
+    if value.startswith('http'):
+        srcset = ', '.join(f"{cloudinary_variant(value, w)} {w}w" for w in DERIVATIVE_WIDTHS)
+        return {'src': cloudinary_variant(value, DERIVATIVE_WIDTHS[-1]), 'srcset': srcset, 'webp_srcset': ''}
+
+    static_dir = os.path.join('static', 'images', folder)
+    original_path = os.path.join(static_dir, value)
+    ext = value.rsplit('.', 1)[-1].lower()
+
+    src = url_for('static', filename=f'images/{folder}/{value}')
+
+    def build(target_ext):
+        entries = []
+        for width in DERIVATIVE_WIDTHS:
+            path = derivative_path(original_path, width, target_ext)
+            if os.path.exists(path):
+                relative = os.path.relpath(path, 'static').replace(os.sep, '/')
+                entries.append(f"{url_for('static', filename=relative)} {width}w")
+        # The original is the largest candidate, so high-DPI screens still get
+        # full resolution. It goes into the WebP set too: every browser that
+        # picks that <source> also decodes JPEG/PNG.
+        original_width = image_width(original_path) if entries else None
+        if original_width:
+            entries.append(f"{src} {original_width}w")
+        return ', '.join(entries)
+
+    return {
+        'src': src,
+        'srcset': build(ext) if ext in FALLBACK_FORMATS and ext != 'webp' else '',
+        # Stills left over from before GIFs were skipped must not mask the animation
+        'webp_srcset': build('webp') if ext != 'gif' else '',
+    }
+
+
+def backfill(folders=IMAGE_FOLDERS):
+    """
+    Generate missing derivatives for every stored original
+
+    Returns:
+        tuple: (images scanned, derivative files written)
+    """
+    scanned = written = 0
+    for folder in folders:
+        directory = os.path.join('static', 'images', folder)
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            path = os.path.join(directory, filename)
+            if not os.path.isfile(path):
+                continue
+            scanned += 1
+            try:
+                written += generate_derivatives(path)
+            except OSError as e:
+                print(f"[IMAGES] Skipping {path}: {e}")
+    return scanned, written
@@ -0,0 +1,222 @@
+"""
+Media Garbage Collector
+Finds stored media that no database row references any more and deletes
+it (`flask --app app media-gc`):
+
+    local       static/images/products, static/images/features,
+                static/videos and their derived/ variants
+    spool       instance/media_spool files no unfinished or failed job points to
+    cloudinary  uploads under CLOUDINARY_PREFIX (images and videos)
+
+Files younger than the grace period are never touched, which covers
+uploads that are stored but not yet committed. Incremental runs check a
+bounded slice per call and resume where the previous run stopped
+(state in instance/media_gc.json).
+"""
+
+import json
+import os
+import re
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from flask import current_app
+from models import db, MediaJob
+from media_store import FOLDERS, REFERENCES, reference_count
+from media_jobs import spool_dir
+
+# Never collect anything modified/created within this many seconds
+GRACE_SECONDS = int(os.environ.get('MEDIA_GC_GRACE_SECONDS', 3600))
+
+CLOUDINARY_PREFIX = os.environ.get('MEDIA_GC_CLOUDINARY_PREFIX', 'altius-biotech/')
+CLOUDINARY_TYPES = ('image', 'video')
+
+# '<stem>-<width>w.<ext>' written by image_pipeline,
+# '<stem>-web.<ext>' / '<stem>-poster.jpg' written by video_pipeline
+DERIVED_NAME = re.compile(r'^(?P<stem>.+)-(\d+w|web|poster)\.[a-z0-9]+$')
+
+# A file (or Cloudinary resource) nobody references
+Orphan = namedtuple('Orphan', ['location', 'name', 'size'])
+
+
+def state_path():
+    return os.path.join(current_app.instance_path, 'media_gc.json')
+
+
+def load_state():
+    try:
+        with open(state_path()) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(state):
+    os.makedirs(current_app.instance_path, exist_ok=True)
+    tmp_path = f"{state_path()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path())
+
+
+def referenced_values():
+    """Every non-empty value of the media columns, per storage folder"""
+    return {folder: {value for column in columns
+                     for (value,) in db.session.query(column).filter(column.isnot(None)).distinct()}
+            for folder, columns in REFERENCES.items()}
+
+
+def local_files(folder):
+    """Sorted (relative name, path) pairs for a folder and its derived/ subfolder"""
+    directory = FOLDERS[folder]
+    files = []
+    for subdir in ('', 'derived'):
+        base = os.path.join(directory, subdir)
+        if not os.path.isdir(base):
+            continue
+        for entry in os.scandir(base):
+            if entry.is_file():
+                files.append((os.path.join(subdir, entry.name) if subdir else entry.name, entry.path))
+    return sorted(files)
+
+
+def is_local_orphan(name, referenced):
+    filename = os.path.basename(name)
+    if filename.startswith('.upload-'):
+        return True  # Temp file left by a crash inside store_upload
+    if os.path.dirname(name):
+        match = DERIVED_NAME.match(filename)
+        stems = {value.rsplit('.', 1)[0] for value in referenced}
+        return match is None or match.group('stem') not in stems
+    return filename not in referenced
+
+
+def take_slice(items, key, state, limit):
+    """Items after the remembered key (wrapping around), at most limit of them"""
+    if limit is None:
+        return items
+    after = state.get(key)
+    remaining = [item for item in items if after is None or item[0] > after]
+    batch = remaining[:limit]
+    # Finished the list: the next run starts from the beginning
+    state[key] = batch[-1][0] if len(batch) == limit and len(remaining) > limit else None
+    return batch
+
+
+def scan_local(referenced, state, limit, cutoff):
+    scanned, orphans = 0, []
+    for folder in FOLDERS:
+        for name, path in take_slice(local_files(folder), f'local:{folder}', state, limit):
+            scanned += 1
+            stat = os.stat(path)
+            if stat.st_mtime < cutoff and is_local_orphan(name, referenced[folder]):
+                orphans.append(Orphan(folder, name, stat.st_size))
+    return scanned, orphans
+
+
+def scan_spool(cutoff):
+    """Spooled uploads that no pending/running job will pick up, and no failed
+    job will after `media-worker --retry-failed`"""
+    directory = spool_dir()
+    payloads = ' '.join(payload or '' for (payload,) in
+                        db.session.query(MediaJob.payload)
+                        .filter(MediaJob.status.in_(['pending', 'running', 'failed'])))
+    scanned, orphans = 0, []
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if not entry.is_file():
+            continue
+        scanned += 1
+        stat = entry.stat()
+        if stat.st_mtime < cutoff and json.dumps(entry.path)[1:-1] not in payloads:
+            orphans.append(Orphan('spool', entry.name, stat.st_size))
+    return scanned, orphans
+
+
+def scan_cloudinary(referenced, state, limit, cutoff):
+    from cloudinary_helper import list_resources, public_id_from_url
+
+    public_ids = {public_id_from_url(value)
+                  for values in referenced.values() for value in values
+                  if value.startswith('http') and '/upload/' in value}
+    scanned, orphans = 0, []
+    for resource_type in CLOUDINARY_TYPES:
+        key = f'cloudinary:{resource_type}'
+        cursor = state.get(key)
+        while True:
+            resources, cursor = list_resources(CLOUDINARY_PREFIX, resource_type, cursor,
+                                               max_results=min(limit or 500, 500))
+            for resource in resources:
+                scanned += 1
+                created = datetime.strptime(resource['created_at'], '%Y-%m-%dT%H:%M:%SZ')
+                created = created.replace(tzinfo=timezone.utc).timestamp()
+                if created < cutoff and resource['public_id'] not in public_ids:
+                    orphans.append(Orphan(key, resource['public_id'], resource.get('bytes', 0)))
+            # Incremental runs take one page per type and remember the cursor
+            if limit is not None or not cursor:
+                break
+        state[key] = cursor if limit is not None else None
+    return scanned, orphans
+
+
+def remove_orphan(orphan):
+    """Delete one local/spool orphan, re-checking references first"""
+    if orphan.location == 'spool':
+        path = os.path.join(spool_dir(), orphan.name)
+    else:
+        path = os.path.join(FOLDERS[orphan.location], orphan.name)
+        # An upload may have started referencing it since the scan
+        if not os.path.dirname(orphan.name) and reference_count(orphan.location, orphan.name):
+            return False
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def collect(dry_run=False, incremental=False, limit=500, cloudinary=True, grace=GRACE_SECONDS):
+    """
+    Find (and unless dry_run, delete) unreferenced media
+
+    Args:
+        dry_run: only report what would be deleted
+        incremental: check at most limit items per source, resuming next run
+        limit: slice size for incremental runs
+        cloudinary: include the Cloudinary listing (when configured)
+        grace: skip items younger than this many seconds
+
+    Returns:
+        dict with 'scanned', 'orphans' (list of Orphan), 'reclaimed_bytes'
+        and 'failed' (orphans that could not be deleted)
+    """
+    from cloudinary_helper import is_cloudinary_configured
+
+    state = load_state() if incremental else {}
+    limit = limit if incremental else None
+    cutoff = time.time() - grace
+    referenced = referenced_values()
+
+    scanned, orphans = scan_local(referenced, state, limit, cutoff)
+    spool_scanned, spool_orphans = scan_spool(cutoff)
+    scanned += spool_scanned
+    orphans += spool_orphans
+    if cloudinary and is_cloudinary_configured():
+        remote_scanned, remote_orphans = scan_cloudinary(referenced, state, limit, cutoff)
+        scanned += remote_scanned
+        orphans += remote_orphans
+
+    failed = []
+    if not dry_run:
+        from cloudinary_helper import delete_public_ids
+        for resource_type in CLOUDINARY_TYPES:
+            remote = [o for o in orphans if o.location == f'cloudinary:{resource_type}']
+            if remote:
+                not_deleted = set(delete_public_ids([o.name for o in remote], resource_type))
+                failed += [o for o in remote if o.name in not_deleted]
+        failed += [o for o in orphans
+                   if not o.location.startswith('cloudinary:') and not remove_orphan(o)]
+        if incremental:
+            save_state(state)
+
+    reclaimed = sum(o.size for o in orphans if o not in failed)
+    return {'scanned': scanned, 'orphans': orphans, 'reclaimed_bytes': reclaimed, 'failed': failed}
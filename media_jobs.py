@@ -0,0 +1,363 @@
+"""
+Media Job Queue
+Persistent queue (media_job table) for slow media work: Cloudinary uploads
+and remote deletes. Admin routes spool uploaded files to disk and enqueue a
+job; the worker started with `flask --app app media-worker` processes them.
+Spooled files live in the instance folder, which the worker must share.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from werkzeug.datastructures import FileStorage
+from werkzeug.utils import secure_filename
+from models import db, Content, Product, ProductImage, MediaJob
+from media_store import release
+
+# 'queue' hands jobs to the worker process; 'inline' runs them in the request
+MEDIA_JOBS_MODE = os.environ.get('MEDIA_JOBS', 'queue')
+MAX_ATTEMPTS = int(os.environ.get('MEDIA_JOB_MAX_ATTEMPTS', 5))
+
+# Seconds between the worker's checks for stale 'running' jobs
+REQUEUE_INTERVAL = 300
+
+# Job being run by this thread, for heartbeat()
+_running = threading.local()
+
+# kind -> handler(payload); handlers return True when public pages changed.
+# On failure they leave only the unfinished work in payload for the retry.
+HANDLERS = {}
+
+
+def handler(kind):
+    """Register a job handler for kind"""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def spool_dir():
+    path = os.path.join(current_app.instance_path, 'media_spool')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def spool_file(file):
+    """Save an uploaded FileStorage to the spool and return [path, original filename]"""
+    filename = secure_filename(file.filename)
+    path = os.path.join(spool_dir(), f"{uuid.uuid4().hex}_{filename}")
+    file.save(path)
+    return [path, file.filename]
+
+
+def spool_path(path, filename):
+    """Move a file already on disk into the spool and return [path, original filename]"""
+    spooled = os.path.join(spool_dir(), f"{uuid.uuid4().hex}_{secure_filename(filename)}")
+    shutil.move(path, spooled)
+    return [spooled, filename]
+
+
+def open_spooled(path, filename):
+    """Reopen a spooled file as a FileStorage for the upload helpers"""
+    return FileStorage(open(path, 'rb'), filename=filename)
+
+
+def discard_spooled(*paths):
+    for path in paths:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+def enqueue(kind, **payload):
+    """
+    Add a job to the queue (committed together with the caller's changes)
+
+    Returns:
+        MediaJob: the new job; flushed so job.id is available
+    """
+    job = MediaJob(kind=kind, payload=json.dumps(payload), status='pending')
+    db.session.add(job)
+    db.session.flush()
+    return job
+
+
+def enqueue_remote_delete(*urls):
+    """
+    Queue deletion of Cloudinary files as one batched job
+
+    Local filenames are ignored. The job row is committed with the
+    caller's database change, so remote files are only deleted after it.
+    """
+    urls = [url for url in urls if url and url.startswith('http')]
+    if urls:
+        return enqueue('delete_remote', urls=urls)
+    return None
+
+
+def run_inline_jobs(on_change=None):
+    """Process pending jobs in this process when MEDIA_JOBS=inline"""
+    if MEDIA_JOBS_MODE == 'inline':
+        while run_next_job(on_change):
+            pass
+
+
+def claim_next_job():
+    """Atomically mark the oldest runnable job as running and return it"""
+    while True:
+        candidate = (MediaJob.query
+                     .filter(MediaJob.status == 'pending', MediaJob.run_after <= datetime.utcnow())
+                     .order_by(MediaJob.id)
+                     .first())
+        if candidate is None:
+            return None
+
+        # Only one worker wins the pending -> running transition
+        claimed = (MediaJob.query
+                   .filter_by(id=candidate.id, status='pending')
+                   .update({'status': 'running', 'attempts': MediaJob.attempts + 1,
+                            'updated_at': datetime.utcnow()}, synchronize_session=False))
+        db.session.commit()
+        if claimed:
+            db.session.refresh(candidate)
+            return candidate
+
+
+def run_next_job(on_change=None):
+    """
+    Run one job
+
+    Args:
+        on_change: callback invoked when a job changed what public pages show
+
+    Returns:
+        bool: True if a job was run, False if the queue was empty
+    """
+    job = claim_next_job()
+    if job is None:
+        return False
+
+    print(f"[JOBS] Running job {job.id} ({job.kind}), attempt {job.attempts}")
+    payload = json.loads(job.payload or '{}')
+    _running.job_id = job.id
+    try:
+        changed = HANDLERS[job.kind](payload)
+        job.status = 'done'
+        job.error = None
+        db.session.commit()
+        if changed and on_change:
+            on_change()
+        print(f"[JOBS] Job {job.id} done")
+    except Exception as e:
+        db.session.rollback()
+        traceback.print_exc()
+        job = db.session.get(MediaJob, job.id)
+        # Handlers drop finished work from the payload, so a retry resumes
+        job.payload = json.dumps(payload)
+        job.error = str(e)
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = 'failed'
+        else:
+            # Exponential backoff: 10s, 20s, 40s, ...
+            job.status = 'pending'
+            job.run_after = datetime.utcnow() + timedelta(seconds=10 * 2 ** (job.attempts - 1))
+        db.session.commit()
+        print(f"[JOBS] Job {job.id} {job.status}: {e}")
+    finally:
+        _running.job_id = None
+    return True
+
+
+def heartbeat():
+    """
+    Mark the job this thread is running as alive
+
+    Long handlers call this periodically so requeue_stale_jobs() never
+    hands a job that is still running to a second worker. Uses its own
+    connection, leaving the handler's session alone.
+    """
+    job_id = getattr(_running, 'job_id', None)
+    if job_id is None:
+        return
+    with db.engine.begin() as connection:
+        connection.execute(MediaJob.__table__.update()
+                           .where(MediaJob.__table__.c.id == job_id)
+                           .values(updated_at=datetime.utcnow()))
+
+
+def requeue_stale_jobs(timeout=timedelta(minutes=30)):
+    """Return jobs left 'running' by a crashed worker to the queue
+
+    Handlers that can run longer than timeout must call heartbeat().
+    """
+    cutoff = datetime.utcnow() - timeout
+    count = (MediaJob.query
+             .filter(MediaJob.status == 'running', MediaJob.updated_at < cutoff)
+             .update({'status': 'pending'}, synchronize_session=False))
+    db.session.commit()
+    return count
+
+
+def retry_failed_jobs():
+    """Give failed jobs a fresh set of attempts"""
+    count = (MediaJob.query
+             .filter(MediaJob.status == 'failed')
+             .update({'status': 'pending', 'attempts': 0, 'run_after': datetime.utcnow()},
+                     synchronize_session=False))
+    db.session.commit()
+    return count
+
+
+def run_worker(on_change=None, poll_interval=2.0, once=False):
+    """Process jobs until interrupted (or until the queue is empty with once=True)"""
+    print(f"[JOBS] Media worker started (poll every {poll_interval}s)")
+    next_requeue = 0
+    while True:
+        try:
+            # Also while running: a job whose failure could not be recorded
+            # stays 'running' until it goes stale
+            if time.monotonic() >= next_requeue:
+                requeue_stale_jobs()
+                next_requeue = time.monotonic() + REQUEUE_INTERVAL
+            ran = run_next_job(on_change)
+        except Exception:
+            # A lost database connection must not end the worker: nothing
+            # restarts it
+            db.session.rollback()
+            traceback.print_exc()
+            print(f"[JOBS] Worker error, retrying in {poll_interval}s")
+            ran = False
+        if not ran:
+            if once:
+                return
+            time.sleep(poll_interval)
+
+
+def job_status(limit=20):
+    """Summary of unfinished and recently failed jobs for the dashboard"""
+    recent = datetime.utcnow() - timedelta(days=1)
+    jobs = (MediaJob.query
+            .filter(db.or_(MediaJob.status.in_(['pending', 'running']),
+                           db.and_(MediaJob.status == 'failed', MediaJob.updated_at >= recent)))
+            .order_by(MediaJob.id.desc())
+            .limit(limit)
+            .all())
+    return {
+        'pending': sum(1 for j in jobs if j.status in ('pending', 'running')),
+        'jobs': [{'id': j.id, 'kind': j.kind, 'status': j.status,
+                  'attempts': j.attempts, 'error': j.error} for j in jobs],
+    }
+
+
+# ============ HANDLERS ============
+
+@handler('delete_remote')
+def handle_delete_remote(payload):
+    from cloudinary_helper import delete_files
+    # Jobs queued before batching carry a single 'url'
+    if 'url' in payload:
+        payload['urls'] = [payload.pop('url')]
+
+    failed = delete_files(payload['urls'])
+    if failed:
+        # Only the failed files are retried
+        payload['urls'] = failed
+        raise RuntimeError(f"Cloudinary delete failed for {len(failed)} file(s): {', '.join(failed)}")
+    return False
+
+
+@handler('image_derivatives')
+def handle_image_derivatives(payload):
+    from image_pipeline import generate_derivatives
+    for path in payload['paths']:
+        generate_derivatives(path)
+    return True
+
+
+@handler('transcode_video')
+def handle_transcode_video(payload):
+    from video_pipeline import transcode
+    return transcode(payload['path'], heartbeat=heartbeat) > 0
+
+
+@handler('upload_hero_video')
+def handle_upload_hero_video(payload):
+    from cloudinary_helper import upload_video
+    path, filename = payload['file']
+    video_file = open_spooled(path, filename)
+    try:
+        video_url = upload_video(video_file, folder='altius-biotech/videos')
+    finally:
+        video_file.close()
+    if not video_url:
+        raise RuntimeError(f"Video upload failed for {filename}")
+
+    content = Content.query.first()
+    old_video = content.hero_video
+    enqueue_remote_delete(old_video)
+    content.hero_video = video_url
+    db.session.commit()
+    discard_spooled(path)
+    release('videos', old_video)
+    return True
+
+
+@handler('upload_product_images')
+def handle_upload_product_images(payload):
+    from cloudinary_helper import upload_image
+    from gallery_uploads import CloudinaryUploader, upload_gallery
+
+    product = db.session.get(Product, payload['product_id'])
+    if product is None:
+        # Product deleted before the upload ran
+        discard_spooled(*[f[0] for f in payload.get('gallery', [])])
+        if payload.get('main'):
+            discard_spooled(payload['main'][0])
+        return False
+
+    if payload.get('main'):
+        path, filename = payload['main']
+        main_file = open_spooled(path, filename)
+        try:
+            image_url = upload_image(main_file, folder='altius-biotech/products')
+        finally:
+            main_file.close()
+        if not image_url:
+            raise RuntimeError(f"Main image upload failed for {filename}")
+        old_image = product.image
+        enqueue_remote_delete(old_image)
+        product.image = image_url
+        db.session.commit()
+        discard_spooled(path)
+        release('products', old_image)
+        # Main image is done; a retry only needs the gallery
+        payload['main'] = None
+
+    gallery = payload.get('gallery', [])
+    if gallery:
+        files = [open_spooled(path, filename) for path, filename, order in gallery]
+        try:
+            uploaded, failed = upload_gallery(files, CloudinaryUploader(upload_image), start_order=0)
+        finally:
+            for f in files:
+                f.close()
+
+        # upload_gallery numbers files from start_order=0, map back to stored orders
+        for result in uploaded:
+            path, filename, order = gallery[result.order]
+            db.session.add(ProductImage(product_id=product.id, image_url=result.url, order=order))
+            discard_spooled(path)
+        db.session.commit()
+
+        if failed:
+            # Retry just the failed files
+            payload['gallery'] = [gallery[result.order] for result in failed]
+            names = ', '.join(result.filename for result in failed)
+            raise RuntimeError(f"Gallery upload failed for {names}")
+    return True
@@ -0,0 +1,171 @@
+"""
+Media Store
+Content-addressed storage for locally saved uploads. Files are named after
+the SHA-256 of their bytes (hashed while streaming to disk), so re-uploading
+the same photo costs no extra space and a stored URL never changes meaning.
+A file is only removed once no database row references it any more.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import time
+import uuid
+from werkzeug.utils import secure_filename
+from models import db, Content, Feature, Product, ProductImage
+
+CHUNK_SIZE = 64 * 1024
+
+# release() leaves files stored or reused this recently to the media GC: an
+# upload that deduped onto one may not have committed its reference yet
+RELEASE_GRACE_SECONDS = int(os.environ.get('MEDIA_RELEASE_GRACE_SECONDS', 600))
+
+# Storage folder -> directory on disk
+FOLDERS = {
+    'products': os.path.join('static', 'images', 'products'),
+    'features': os.path.join('static', 'images', 'features'),
+    'videos': os.path.join('static', 'videos'),
+}
+
+# Storage folder -> columns that may reference a file in it
+REFERENCES = {
+    'products': [Product.image, ProductImage.image_url],
+    'features': [Feature.image],
+    'videos': [Content.hero_video],
+}
+
+# <64 hex chars>.<ext> (or a '<hash>-<width>w.<ext>' / '<hash>-web.<ext>' /
+# '<hash>-poster.jpg' derivative);
+# anything else predates the content-addressed store
+CONTENT_ADDRESSED_NAME = re.compile(r'^[0-9a-f]{64}(-\d+w|-web|-poster)?\.[a-z0-9]+$')
+
+
+def is_content_addressed(filename):
+    """True if filename was produced by store_upload (its bytes never change)"""
+    return bool(CONTENT_ADDRESSED_NAME.match(os.path.basename(filename)))
+
+
+def folder_path(folder, filename):
+    return os.path.join(FOLDERS[folder], filename)
+
+
+def store_upload(file, folder):
+    """
+    Stream an uploaded file into the store
+
+    Args:
+        file: FileStorage object from request.files
+        folder: 'products', 'features' or 'videos'
+
+    Returns:
+        str: stored filename '<sha256>.<ext>', saved as-is in the database
+    """
+    directory = FOLDERS[folder]
+    os.makedirs(directory, exist_ok=True)
+
+    original = secure_filename(file.filename)
+    ext = original.rsplit('.', 1)[1].lower() if '.' in original else 'bin'
+
+    # Unique temp name so concurrent uploads never clobber each other
+    tmp_path = os.path.join(directory, f".upload-{uuid.uuid4().hex}.tmp")
+    digest = hashlib.sha256()
+    try:
+        with open(tmp_path, 'wb') as out:
+            while True:
+                chunk = file.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+
+        return _place(tmp_path, directory, f"{digest.hexdigest()}.{ext}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def store_file(path, folder, original_filename):
+    """
+    Move a file that is already on disk (a finished chunked upload) into the store
+
+    The file is hashed in CHUNK_SIZE reads and then moved, not copied.
+
+    Returns:
+        str: stored filename '<sha256>.<ext>'
+    """
+    directory = FOLDERS[folder]
+    os.makedirs(directory, exist_ok=True)
+
+    original = secure_filename(original_filename)
+    ext = original.rsplit('.', 1)[1].lower() if '.' in original else 'bin'
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+
+    # Same temp naming as store_upload, so the media GC recognises leftovers
+    tmp_path = os.path.join(directory, f".upload-{uuid.uuid4().hex}.tmp")
+    try:
+        shutil.move(path, tmp_path)
+        return _place(tmp_path, directory, f"{digest.hexdigest()}.{ext}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _place(tmp_path, directory, filename):
+    """Give a fully written temp file its content-addressed name"""
+    path = os.path.join(directory, filename)
+    if os.path.exists(path):
+        print(f"[MEDIA] Duplicate upload, reusing {filename}")
+        os.remove(tmp_path)
+        # Fresh mtime keeps the media GC's grace period from racing this upload
+        os.utime(path)
+    else:
+        os.replace(tmp_path, path)
+    return filename
+
+
+def reference_count(folder, filename):
+    """Number of database rows that reference filename in folder"""
+    return sum(db.session.query(column).filter(column == filename).count()
+               for column in REFERENCES[folder])
+
+
+def release(folder, filename):
+    """
+    Drop one reference to a stored file, deleting it when none are left
+
+    Call after the change that removed the reference has been committed.
+    Files touched within RELEASE_GRACE_SECONDS are kept (see _place) and
+    left to the media GC.
+
+    Returns:
+        bool: True if the file (and any derivatives) was deleted
+    """
+    if not filename or filename.startswith('http'):
+        return False
+    if reference_count(folder, filename) > 0:
+        return False
+
+    path = folder_path(folder, filename)
+    try:
+        if time.time() - os.path.getmtime(path) < RELEASE_GRACE_SECONDS:
+            print(f"[MEDIA] Keeping recently stored {filename} for the media GC")
+            return False
+    except FileNotFoundError:
+        return False
+
+    from image_pipeline import remove_image
+    from video_pipeline import remove_video
+    if folder == 'videos':
+        remove_video(path)
+    else:
+        remove_image(path)
+    print(f"[MEDIA] Deleted unreferenced {path}")
+    return True
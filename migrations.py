@@ -0,0 +1,212 @@
+"""
+Database Migrations
+Versioned schema changes and default content seeding. These run once per
+deploy (`flask --app app bootstrap`, the Procfile release step) instead of
+on every worker import, so web and worker processes start without touching
+the database. Applied versions are recorded in the schema_version table.
+"""
+
+import os
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, text
+from werkzeug.security import generate_password_hash
+from models import db, Admin, Content, Feature, Product
+
+# Kept out of the models' metadata so db.create_all() never touches it
+schema_version = Table(
+    'schema_version', MetaData(),
+    Column('version', Integer, primary_key=True),
+    Column('name', String(200)),
+    Column('applied_at', DateTime),
+)
+
+# Arbitrary constant identifying the PostgreSQL advisory lock
+MIGRATION_LOCK_KEY = 72410501
+
+# (version, name, function(connection)), ordered by version
+MIGRATIONS = []
+
+
+def migration(version, name):
+    """Register a function as schema migration <version>"""
+    def register(func):
+        MIGRATIONS.append((version, name, func))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+    return register
+
+
+@migration(1, 'create tables')
+def create_tables(connection):
+    # Baseline for new and pre-versioning databases alike: tables that
+    # already exist are skipped (formerly create_gallery_table.py)
+    db.metadata.create_all(connection)
+
+
+@migration(2, 'product_image indexes')
+def product_image_indexes(connection):
+    # Formerly add_product_image_table.sql
+    connection.execute(text('CREATE INDEX IF NOT EXISTS idx_product_image_product_id ON product_image (product_id)'))
+    connection.execute(text('CREATE INDEX IF NOT EXISTS idx_product_image_order ON product_image ("order")'))
+
+
+@migration(3, 'content_history created_at index')
+def content_history_created_at_index(connection):
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_content_history_created_at ON content_history (created_at)'))
+
+
+@migration(4, 'ordering indexes')
+def ordering_indexes(connection):
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_feature_order ON feature ("order")'))
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_product_order ON product ("order")'))
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_product_image_product_id_order '
+                            'ON product_image (product_id, "order", id)'))
+    # Both are covered by the composite index and only slow down writes
+    connection.execute(text('DROP INDEX IF EXISTS idx_product_image_product_id'))
+    connection.execute(text('DROP INDEX IF EXISTS idx_product_image_order'))
+
+
+@migration(5, 'page_cache_version table')
+def page_cache_version_table(connection):
+    # Shared page-cache version for PAGE_CACHE_BACKEND=database
+    connection.execute(text('CREATE TABLE IF NOT EXISTS page_cache_version '
+                            '(id INTEGER PRIMARY KEY, version INTEGER NOT NULL, changed_at FLOAT NOT NULL)'))
+    if connection.execute(text('SELECT 1 FROM page_cache_version WHERE id = 1')).first() is None:
+        connection.execute(text('INSERT INTO page_cache_version (id, version, changed_at) VALUES (1, 0, 0)'))
+
+
+def lock(connection):
+    """Serialize concurrent migration runs for the current transaction"""
+    # SQLite already locks the whole file while a write transaction is open
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+
+
+def applied_versions(connection):
+    schema_version.create(connection, checkfirst=True)
+    return {row.version for row in connection.execute(schema_version.select())}
+
+
+def status():
+    """
+    Migration state of the database
+
+    Returns:
+        list of (version, name, applied) tuples
+    """
+    with db.engine.begin() as connection:
+        applied = applied_versions(connection)
+    return [(version, name, version in applied) for version, name, _ in MIGRATIONS]
+
+
+def upgrade():
+    """
+    Apply pending migrations in order, each in its own transaction
+
+    Returns:
+        list of (version, name) that were applied
+    """
+    applied = []
+    for version, name, func in MIGRATIONS:
+        with db.engine.begin() as connection:
+            lock(connection)
+            # Re-checked under the lock: another process may have won the race
+            if version in applied_versions(connection):
+                continue
+            func(connection)
+            connection.execute(schema_version.insert().values(
+                version=version, name=name, applied_at=datetime.utcnow()))
+        print(f"[MIGRATE] Applied {version}: {name}")
+        applied.append((version, name))
+    return applied
+
+
+def seed_defaults():
+    """
+    Insert the default admin, content, features and products where missing
+
+    Returns:
+        list: names of the tables that were seeded
+    """
+    seeded = []
+
+    # Create default admin if doesn't exist with hashed password
+    if not Admin.query.first():
+        default_password = os.environ.get('ADMIN_PASSWORD', 'admin123')
+        admin = Admin(
+            username=os.environ.get('ADMIN_USERNAME', 'admin'),
+            password=generate_password_hash(default_password, method='pbkdf2:sha256')
+        )
+        db.session.add(admin)
+        seeded.append('admin')
+
+    # Create default content if doesn't exist
+    if not Content.query.first():
+        content = Content(
+            # Hero Section
+            hero_label="◆ Innovation Redefined",
+            hero_title="The Future of Medical Aesthetics",
+            hero_description="ALTIUS BIOTECH brings cutting-edge medical aesthetic technology from South Korea's DSE Inc. to Myanmar. We're not just distributing equipment—we're revolutionizing healthcare delivery with premium CE-certified solutions.",
+            stat1_number="100%",
+            stat1_text="CE Certified Excellence",
+            stat2_number="DSE",
+            stat2_text="South Korea Technology",
+
+            # Features Section
+            features_label="◆ Why Choose Us",
+            features_title="Advancing Science. Elevating Life.",
+            features_description="ALTIUS BIOTECH Co., Ltd is Myanmar's premier distributor of advanced medical aesthetic devices, bringing world-class technology to your practice.",
+
+            # Products Section
+            products_label="◆ Our Portfolio",
+            products_title="Next-Gen Medical Devices",
+            products_description="Exclusive distributor of DSE Inc. (South Korea) premium aesthetic medical equipment",
+
+            # Contact Section
+            contact_tagline="◆ Connect With Us",
+            contact_title="Transform Your Practice",
+            contact_description="Ready to elevate your capabilities with premium medical aesthetic technology? Get in touch with our specialists to discover how ALTIUS BIOTECH can provide the solutions your practice needs to deliver exceptional results.",
+            contact_phone="+95 95128556",
+            contact_email="khinlapyaewoon6@gmail.com",
+            contact_address="No: 31, Inya Myaing Road\nKhayay Myaing Street, Golden Valley 1 Ward\nBahan, Yangon, Myanmar",
+
+            # Company Info
+            company_name="ALTIUS BIOTECH",
+            company_tagline="Advancing Science. Elevating Life.",
+            footer_text="Leading Myanmar's aesthetic medicine revolution with premium technology and unwavering commitment to excellence. Advancing science and elevating life through innovative healthcare solutions."
+        )
+        db.session.add(content)
+        seeded.append('content')
+
+    # Create default features if don't exist
+    if Feature.query.count() == 0:
+        features = [
+            Feature(icon='🎯', title='Premium Quality', description='Every device meets rigorous CE certification standards, ensuring the highest level of safety and performance for your patients.', order=1),
+            Feature(icon='🚀', title='Innovation First', description="Access to the latest aesthetic medical technology from DSE Inc., South Korea's leading manufacturer of advanced devices.", order=2),
+            Feature(icon='💎', title='Expert Support', description='Comprehensive training, technical support, and ongoing assistance to ensure optimal results with every treatment.', order=3),
+            Feature(icon='🏥', title='Trusted Partner', description="Serving Myanmar's leading medical clinics and hospitals with reliable, professional distribution services.", order=4),
+            Feature(icon='🌏', title='Global Vision', description='Expanding from local excellence to international impact, bringing global standards to Myanmar healthcare.', order=5),
+            Feature(icon='✓', title='Proven Results', description='Delivering measurable outcomes and exceptional patient satisfaction through superior medical technology.', order=6),
+        ]
+        db.session.add_all(features)
+        seeded.append('feature')
+
+    # Create default products if don't exist
+    if Product.query.count() == 0:
+        products = [
+            Product(icon='⚡', title='Advanced Laser Systems', description='Precision-engineered laser technology delivering superior aesthetic results with unmatched safety profiles and patient comfort.', order=1),
+            Product(icon='💉', title='Injectable Solutions', description='State-of-the-art delivery systems optimized for precision, control, and exceptional patient experience.', order=2),
+            Product(icon='🔬', title='RF Energy Devices', description='Cutting-edge radiofrequency technology for skin rejuvenation and body contouring with proven clinical efficacy.', order=3),
+        ]
+        db.session.add_all(products)
+        seeded.append('product')
+
+    db.session.commit()
+    return seeded
+
+
+def bootstrap():
+    """Bring the database fully up to date: migrations, then default data"""
+    applied = upgrade()
+    seeded = seed_defaults()
+    return applied, seeded
@@ -1,7 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+# RoutingSession sends public reads to a read replica when one is configured
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class Content(db.Model):
     """Main content table - stores all editable content"""
@@ -50,7 +52,7 @@ class Feature(db.Model):
     image = db.Column(db.String(255))  # Store feature image filename
     title = db.Column(db.String(100))
     description = db.Column(db.Text)
-    order = db.Column(db.Integer, default=0)
+    order = db.Column(db.Integer, default=0, index=True)  # Indexed for ORDER BY "order"
 
 
 class Product(db.Model):
@@ -60,14 +62,21 @@ class Product(db.Model):
     image = db.Column(db.String(500))  # Primary/main product image
     title = db.Column(db.String(100))
     description = db.Column(db.Text)
-    order = db.Column(db.Integer, default=0)
+    order = db.Column(db.Integer, default=0, index=True)  # Indexed for ORDER BY "order"
 
     # Relationship to product images gallery
-    images = db.relationship('ProductImage', backref='product', lazy=True, cascade='all, delete-orphan')
+    images = db.relationship('ProductImage', backref='product', lazy=True, cascade='all, delete-orphan',
+                             order_by='(ProductImage.order, ProductImage.id)')
 
 
 class ProductImage(db.Model):
     """Product image gallery - multiple images per product"""
+    # Serves both the gallery lookup (product_id = ? / IN (...)) and its
+    # ORDER BY "order", id without a separate sort
+    __table_args__ = (
+        db.Index('ix_product_image_product_id_order', 'product_id', 'order', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
     image_url = db.Column(db.String(500))  # Cloudinary URL or filename
@@ -79,7 +88,7 @@ class ContentHistory(db.Model):
     """Content backup history for rollback feature"""
     id = db.Column(db.Integer, primary_key=True)
     content_snapshot = db.Column(db.Text)  # JSON snapshot of content
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # Indexed for keyset pagination
     created_by = db.Column(db.String(50), default='admin')
     description = db.Column(db.String(200))
 
@@ -88,4 +97,16 @@ class Admin(db.Model):
     """Admin login"""
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(50), unique=True)
-    password = db.Column(db.String(255))  # Stores hashed password (pbkdf2:sha256)
\ No newline at end of file
+    password = db.Column(db.String(255))  # Stores hashed password (pbkdf2:sha256)
+
+class MediaJob(db.Model):
+    """Queued media upload/delete work, processed by the media worker"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # Handler name, e.g. 'upload_hero_video'
+    payload = db.Column(db.Text)  # JSON arguments for the handler
+    status = db.Column(db.String(20), default='pending', index=True)  # pending, running, done, failed
+    attempts = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow)  # Earliest time to (re)try
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
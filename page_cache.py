@@ -0,0 +1,224 @@
+"""
+Page Cache Module
+Keeps rendered public pages in worker memory. Every entry is tagged with a
+shared version counter that admin writes bump, so all gunicorn workers drop
+their stale copies on the next request. The file/sqlite backends share the
+counter through the instance folder (one host); the database backend keeps
+it in the main database, so web dynos and a media worker on other hosts
+see each other's bumps.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from sqlalchemy import text
+
+# A rendered page plus the validators used for conditional requests.
+# The ETag is a hash of the body, so every worker agrees on it.
+CachedPage = namedtuple('CachedPage', ['body', 'etag', 'last_modified'])
+
+
+def build_page(body):
+    """Wrap a rendered body with its ETag and render time"""
+    etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+    return CachedPage(body, etag, datetime.now(timezone.utc).replace(microsecond=0))
+
+
+class MemoryVersionBackend:
+    """Version counter local to one process (development server / tests)"""
+
+    def __init__(self):
+        self._version = 0
+        self._changed_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_version(self):
+        return self._version
+
+    def changed_at(self):
+        return self._changed_at
+
+    def bump(self):
+        with self._lock:
+            self._version += 1
+            self._changed_at = time.time()
+            return self._version
+
+
+class FileVersionBackend:
+    """Version token stored in a small file shared by all workers on the host"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def get_version(self):
+        try:
+            with open(self.path) as f:
+                return f.read()
+        except FileNotFoundError:
+            return '0'
+
+    def changed_at(self):
+        try:
+            return os.path.getmtime(self.path)
+        except FileNotFoundError:
+            return 0.0
+
+    def bump(self):
+        # A unique token per bump avoids lost updates when two workers
+        # invalidate at the same time (no read-modify-write needed)
+        version = f"{time.time_ns()}-{os.getpid()}"
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, self.path)
+        return version
+
+
+class SQLiteVersionBackend:
+    """Version counter kept in a standalone SQLite file shared by all workers"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('CREATE TABLE IF NOT EXISTS page_cache_version (id INTEGER PRIMARY KEY, version INTEGER NOT NULL)')
+                conn.execute('INSERT OR IGNORE INTO page_cache_version (id, version) VALUES (1, 0)')
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get_version(self):
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT version FROM page_cache_version WHERE id = 1').fetchone()
+            return row[0] if row else 0
+        finally:
+            conn.close()
+
+    def changed_at(self):
+        # The file only ever holds the counter, so its mtime is the last bump
+        return os.path.getmtime(self.path)
+
+    def bump(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('UPDATE page_cache_version SET version = version + 1 WHERE id = 1')
+            return self.get_version()
+        finally:
+            conn.close()
+
+
+class DatabaseVersionBackend:
+    """Version counter in the main database's page_cache_version table (migration 5)"""
+
+    def __init__(self, app):
+        self.db = app.extensions['sqlalchemy']
+
+    def _row(self):
+        # Always the primary: a lagging replica would hide a fresh bump
+        return self.db.session.execute(
+            text('SELECT version, changed_at FROM page_cache_version WHERE id = 1'),
+            bind_arguments={'bind': self.db.engine}).first()
+
+    def get_version(self):
+        row = self._row()
+        return row.version if row else 0
+
+    def changed_at(self):
+        row = self._row()
+        return row.changed_at if row else 0.0
+
+    def bump(self):
+        # Own transaction: callers bump after committing their change
+        with self.db.engine.begin() as connection:
+            connection.execute(text('UPDATE page_cache_version SET version = version + 1, '
+                                    'changed_at = :now WHERE id = 1'), {'now': time.time()})
+        return self.get_version()
+
+
+class PageCache:
+    """Rendered page cache validated against a pluggable version backend"""
+
+    def __init__(self, backend=None, max_entries=64):
+        self.backend = backend
+        self.max_entries = max_entries
+        self._entries = {}
+
+    def init_app(self, app):
+        """Use the PAGE_CACHE_BACKEND configured for app (shared via its instance folder)"""
+        self.backend = create_backend(app.config.get('PAGE_CACHE_BACKEND'), app.instance_path, app)
+        self._entries.clear()
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def get_or_render(self, key, render):
+        """Return the CachedPage for key, calling render() for the body on a miss"""
+        if not self.enabled:
+            return build_page(render())
+
+        # Read the version before rendering so a concurrent admin write
+        # can never be cached under the newer version
+        version = self.backend.get_version()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        page = build_page(render())
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[key] = (version, page)
+        return page
+
+    def changed_at(self):
+        """Unix time of the last invalidation in any worker (None when disabled)"""
+        if not self.enabled:
+            return None
+        return self.backend.changed_at()
+
+    def invalidate(self):
+        """Drop cached pages in every worker"""
+        if not self.enabled:
+            return
+        self._entries.clear()
+        self.backend.bump()
+
+
+def create_backend(name, instance_path, app=None):
+    """
+    Build a version backend from its configured name
+
+    Args:
+        name: 'file', 'sqlite', 'database', 'memory' or 'none'
+        instance_path: Flask instance folder used for the shared files
+        app: Flask app whose database the 'database' backend uses
+
+    Returns:
+        Backend object, or None when page caching is disabled
+    """
+    name = (name or 'file').lower()
+    if name == 'none':
+        return None
+    if name == 'memory':
+        return MemoryVersionBackend()
+    if name == 'sqlite':
+        path = os.environ.get('PAGE_CACHE_SQLITE_PATH', os.path.join(instance_path, 'page_cache.sqlite'))
+        return SQLiteVersionBackend(path)
+    if name == 'database':
+        return DatabaseVersionBackend(app)
+    if name == 'file':
+        path = os.environ.get('PAGE_CACHE_VERSION_FILE', os.path.join(instance_path, 'page_cache.version'))
+        return FileVersionBackend(path)
+    raise ValueError(f"Unknown PAGE_CACHE_BACKEND: {name}")
@@ -0,0 +1,70 @@
+"""
+Query Helpers
+Shared read queries for the public pages and the admin dashboard
+"""
+
+from flask import g
+from sqlalchemy import inspect
+from sqlalchemy.orm import selectinload
+from models import db, Content, Feature, Product
+
+# Process-wide copy of the content row, validated against a version backend
+# (see page_cache.py) that admin writes bump
+_shared_content = {'backend': None, 'version': None, 'content': None}
+
+
+def enable_shared_content_cache(backend):
+    """Keep the content row across requests while backend's version is unchanged"""
+    _shared_content.update(backend=backend, version=None, content=None)
+
+
+def get_content(for_update=False):
+    """
+    The single site content row, fetched at most once per request
+
+    Args:
+        for_update: True for handlers that modify the row; they always get
+            an instance attached to the current session
+
+    Returns:
+        Content instance or None if the table is empty
+    """
+    content = g.get('content')
+    if content is not None and (not for_update or not inspect(content).detached):
+        return content
+
+    backend = _shared_content['backend']
+    if backend is not None and not for_update:
+        version = backend.get_version()
+        if _shared_content['content'] is not None and _shared_content['version'] == version:
+            content = _shared_content['content']
+        else:
+            content = Content.query.first()
+            if content is not None:
+                # Detach so later commits in other requests never expire it
+                db.session.expunge(content)
+            _shared_content.update(version=version, content=content)
+    else:
+        content = Content.query.first()
+
+    g.content = content
+    return content
+
+
+def ordered_features():
+    """All features in display order"""
+    return Feature.query.order_by(Feature.order).all()
+
+
+def products_with_images():
+    """
+    All products in display order with their galleries preloaded
+
+    Galleries come from a single extra SELECT ... WHERE product_id IN (...)
+    ordered by product_image."order" in SQL, so the number of statements
+    stays constant however many products there are.
+    """
+    return (Product.query
+            .options(selectinload(Product.images))
+            .order_by(Product.order)
+            .all())
@@ -0,0 +1,42 @@
+"""
+Route Table
+Collects view functions at import time so create_app() can register only
+the routes a worker role serves. Unlike a Blueprint, endpoints keep their
+plain names, and routes served by another role are still registered for
+URL building, so url_for('index') works in an admin-only worker.
+"""
+
+from flask import abort
+
+
+def not_served(**kwargs):
+    """View for routes that belong to another worker role"""
+    abort(404)
+
+
+class RouteTable:
+    """Deferred @app.route registrations"""
+
+    def __init__(self):
+        self.rules = []
+        self._endpoints = None
+
+    def route(self, rule, **options):
+        """Same signature as Flask.route; recorded until init_app()"""
+        def decorator(func):
+            endpoint = options.pop('endpoint', func.__name__)
+            self.rules.append((rule, endpoint, func, options))
+            self._endpoints = None
+            return func
+        return decorator
+
+    def endpoints(self):
+        """Endpoint names (built once; checked on every request by hooks)"""
+        if self._endpoints is None:
+            self._endpoints = frozenset(endpoint for _, endpoint, _, _ in self.rules)
+        return self._endpoints
+
+    def init_app(self, app, serve=True):
+        """Register the routes; with serve=False they are only used to build URLs"""
+        for rule, endpoint, func, options in self.rules:
+            app.add_url_rule(rule, endpoint, func if serve else not_served, **options)
@@ -0,0 +1,79 @@
+"""
+Security Headers
+Header sets are built once at import, one per route class:
+    page     public HTML pages
+    admin    admin HTML pages
+    static   static files and stored media
+    api      JSON responses
+so the after_request hook only copies a few prebuilt strings per response.
+
+Scripts run without 'unsafe-inline': pages load their JS from /static, and
+an inline <script> needs nonce="{{ csp_nonce() }}". The nonce is created
+on first use in a request and only then spliced into the CSP. Pages served
+from the page cache are rendered once for many requests, so they must not
+use nonces (keep their scripts in static files).
+"""
+
+import secrets
+from flask import g
+
+COMMON_HEADERS = {
+    'X-Content-Type-Options': 'nosniff',
+    'X-Frame-Options': 'DENY',
+    'X-XSS-Protection': '1; mode=block',
+    'Strict-Transport-Security': 'max-age=31536000; includeSubDomains',
+}
+
+# {scripts} is "'self'" or "'self' 'nonce-...'"
+PAGE_CSP = ("default-src 'self'; script-src {scripts}; "
+            "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
+            "font-src 'self' https://fonts.gstatic.com; "
+            "img-src 'self' data: https://res.cloudinary.com; "
+            "media-src 'self' https://res.cloudinary.com; "
+            "frame-src https://www.google.com; "
+            "base-uri 'self'; object-src 'none'")
+ADMIN_CSP = PAGE_CSP.replace("frame-src https://www.google.com", "frame-src 'none'") + "; form-action 'self'"
+
+# Nothing in a file or JSON body may load or run anything (e.g. an SVG opened directly)
+STATIC_CSP = "default-src 'none'; style-src 'unsafe-inline'; img-src 'self' data:; sandbox"
+API_CSP = "default-src 'none'; frame-ancestors 'none'"
+
+
+def _header_set(csp):
+    headers = dict(COMMON_HEADERS)
+    headers['Content-Security-Policy'] = csp
+    return list(headers.items())
+
+
+HEADER_SETS = {
+    'page': _header_set(PAGE_CSP.format(scripts="'self'")),
+    'admin': _header_set(ADMIN_CSP.format(scripts="'self'")),
+    'static': _header_set(STATIC_CSP),
+    'api': _header_set(API_CSP),
+}
+
+# Split around the script sources so a nonce costs one concatenation
+NONCE_CSP = {
+    route_class: tuple(csp.split('{scripts}'))
+    for route_class, csp in (('page', PAGE_CSP), ('admin', ADMIN_CSP))
+}
+
+
+def csp_nonce():
+    """Template helper: this request's script nonce (created on first use)"""
+    nonce = g.get('csp_nonce')
+    if nonce is None:
+        nonce = g.csp_nonce = secrets.token_urlsafe(16)
+    return nonce
+
+
+def apply_headers(response, route_class):
+    """Set the prebuilt headers for route_class, with this request's nonce if one was used"""
+    headers = response.headers
+    for name, value in HEADER_SETS[route_class]:
+        headers[name] = value
+    nonce = g.get('csp_nonce')
+    if nonce is not None and route_class in NONCE_CSP:
+        before, after = NONCE_CSP[route_class]
+        headers['Content-Security-Policy'] = f"{before}'self' 'nonce-{nonce}'{after}"
+    return response
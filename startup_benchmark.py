@@ -0,0 +1,84 @@
+"""
+Startup Benchmark
+Measures cold import time of app.py and the latency of the first request
+in fresh interpreter processes, so worker boot cost can be compared
+between checkouts (e.g. a `git worktree` of an older commit):
+
+    python startup_benchmark.py [--runs N] [--role public] [tree ...]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Runs inside the measured process (cwd = tree)
+CHILD = r'''
+import json, sys, time
+sys.path.insert(0, '.')
+started = time.perf_counter()
+import app as module
+imported = time.perf_counter()
+response = module.app.test_client().get(sys.argv[1])
+finished = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_request_ms': (finished - imported) * 1000,
+    'status': response.status_code,
+    'cloudinary_loaded': 'cloudinary' in sys.modules,
+    'pillow_loaded': 'PIL' in sys.modules,
+}))
+'''
+
+# Creates the schema first (trees that predate the bootstrap command do it on import)
+SETUP = r'''
+import sys
+sys.path.insert(0, '.')
+import app as module
+if hasattr(module, 'bootstrap_database'):
+    with module.app.app_context():
+        module.bootstrap_database()
+'''
+
+PATHS = {'public': '/', 'admin': '/admin', 'all': '/'}
+
+
+def run(tree, role, runs, env):
+    subprocess.run([sys.executable, '-c', SETUP], cwd=tree, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', CHILD, PATHS[role]], cwd=tree, env=env,
+                                check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('trees', nargs='*', default=['.'], help='checkouts to compare')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--role', choices=sorted(PATHS), default='public')
+    args = parser.parse_args()
+
+    print(f"{'tree':<30} {'import ms':>10} {'1st req ms':>11} {'status':>7}  cloudinary  pillow")
+    for tree in args.trees:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ,
+                       APP_ROLE=args.role,
+                       DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                       PAGE_CACHE_VERSION_FILE=os.path.join(tmp, 'page_cache.version'))
+            results = run(tree, args.role, args.runs, env)
+
+        import_ms = statistics.median(r['import_ms'] for r in results)
+        request_ms = statistics.median(r['first_request_ms'] for r in results)
+        last = results[-1]
+        print(f"{tree:<30} {import_ms:>10.1f} {request_ms:>11.1f} {last['status']:>7}  "
+              f"{'yes' if last['cloudinary_loaded'] else 'no':<10}  {'yes' if last['pillow_loaded'] else 'no'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+// Admin panel behaviour shared by every admin page
+
+// Links and buttons with data-confirm ask before navigating/submitting
+// (replaces inline onclick handlers, which the CSP does not allow)
+document.addEventListener('click', function(e) {
+    const target = e.target.closest('[data-confirm]');
+    if (target && !confirm(target.getAttribute('data-confirm'))) {
+        e.preventDefault();
+    }
+});
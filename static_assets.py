@@ -0,0 +1,51 @@
+"""
+Static Asset Fingerprinting
+Appends ?v=<fingerprint> to url_for('static', ...) URLs so browsers can
+cache them forever; a changed file gets a new URL automatically.
+"""
+
+import hashlib
+import os
+from media_store import is_content_addressed
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Files above this size are fingerprinted from mtime/size instead of contents
+HASH_SIZE_LIMIT = 1024 * 1024
+
+# (path, mtime_ns, size) -> fingerprint
+_fingerprints = {}
+
+
+def fingerprint(path):
+    """Short fingerprint of a file, cached until its mtime or size changes"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    value = _fingerprints.get(key)
+    if value is None:
+        if stat.st_size <= HASH_SIZE_LIMIT:
+            with open(path, 'rb') as f:
+                value = hashlib.md5(f.read()).hexdigest()[:12]
+        else:
+            value = f"{stat.st_mtime_ns:x}{stat.st_size:x}"[-12:]
+        _fingerprints[key] = value
+    return value
+
+
+def add_fingerprint(static_folder, values):
+    """url_defaults hook body: add v=<fingerprint> for a static filename"""
+    filename = values.get('filename')
+    if not filename or 'v' in values or is_content_addressed(filename):
+        return
+    value = fingerprint(os.path.join(static_folder, filename))
+    if value:
+        values['v'] = value
+
+
+def is_immutable(filename, args):
+    """True if a static URL can never change content (fingerprinted or content-addressed)"""
+    return bool(args.get('v')) or is_content_addressed(filename or '')
@@ -0,0 +1,39 @@
+"""
+Shared fixtures: a fresh app on its own SQLite database per test.
+No application context is left pushed, so every test-client request gets
+its own database session, as it would in production.
+"""
+
+import pytest
+import media_jobs
+from app import bootstrap_database, create_app
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """Build an app on an empty temp database (no migrations run)"""
+    def make(role='all'):
+        monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+        monkeypatch.setenv('PAGE_CACHE_BACKEND', 'none')
+        # media_jobs read MEDIA_JOBS when app imported it, so set the mode itself
+        monkeypatch.setattr(media_jobs, 'MEDIA_JOBS_MODE', 'inline')
+        app = create_app(role)
+        app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+        # Spool, chunked uploads and GC state stay out of the real instance folder
+        app.instance_path = str(tmp_path / 'instance')
+        return app
+    return make
+
+
+@pytest.fixture
+def app(make_app):
+    """App with migrations applied and default content seeded"""
+    app = make_app()
+    with app.app_context():
+        bootstrap_database()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,62 @@
+"""Resumable chunked uploads (chunked_uploads + /admin/uploads)"""
+
+import fcntl
+import os
+import pytest
+from chunked_uploads import upload_dir
+
+
+@pytest.fixture
+def admin(client):
+    with client.session_transaction() as session:
+        session['admin'] = True
+    return client
+
+
+def create(admin, size):
+    response = admin.post('/admin/uploads', json={'filename': 'hero.mp4', 'size': size})
+    assert response.status_code == 201
+    return response.json['id']
+
+
+def put(admin, upload_id, offset, data):
+    return admin.put(f'/admin/uploads/{upload_id}', data=data, headers={'Upload-Offset': str(offset)})
+
+
+def test_resume_after_partial_chunk(admin):
+    data = os.urandom(3000)
+    upload_id = create(admin, len(data))
+
+    assert put(admin, upload_id, 0, data[:1000]).json['offset'] == 1000
+    # Connection dropped half way through the second chunk
+    assert put(admin, upload_id, 1000, data[1000:1500]).json['offset'] == 1500
+
+    stale = put(admin, upload_id, 1000, data[1000:2000])
+    assert stale.status_code == 409
+    assert stale.json['offset'] == 1500
+
+    assert admin.get(f'/admin/uploads/{upload_id}').json['offset'] == 1500
+    done = put(admin, upload_id, 1500, data[1500:])
+    assert done.json['complete'] is True
+
+
+def test_concurrent_write_to_same_upload_is_rejected(app, admin):
+    upload_id = create(admin, 2000)
+    with app.app_context():
+        part_path = os.path.join(upload_dir(), f'{upload_id}.part')
+
+    # Another request is still streaming into the upload
+    with open(part_path, 'r+b') as other:
+        fcntl.flock(other.fileno(), fcntl.LOCK_EX)
+        response = put(admin, upload_id, 0, b'x' * 1000)
+    assert response.status_code == 409
+    assert os.path.getsize(part_path) == 0
+
+    assert put(admin, upload_id, 0, b'x' * 1000).json['offset'] == 1000
+
+
+def test_more_data_than_declared_size(admin):
+    upload_id = create(admin, 100)
+    response = put(admin, upload_id, 0, b'x' * 101)
+    assert response.status_code == 413
+    assert admin.get(f'/admin/uploads/{upload_id}').json['offset'] == 0
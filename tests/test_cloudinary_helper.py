@@ -0,0 +1,25 @@
+"""Cloudinary storage resolution (cloudinary_helper)"""
+
+import pytest
+import cloudinary_helper
+
+pytest.importorskip('cloudinary')
+
+
+def test_sdk_uses_the_resolved_backend_not_later_env_changes(monkeypatch):
+    monkeypatch.setenv('CLOUDINARY_CLOUD_NAME', 'resolved-cloud')
+    monkeypatch.setenv('CLOUDINARY_API_KEY', 'resolved-key')
+    monkeypatch.setenv('CLOUDINARY_API_SECRET', 'resolved-secret')
+    backend = cloudinary_helper.reload_storage_backend()
+    assert backend.cloudinary
+    assert 'resolved-secret' not in repr(backend)
+
+    monkeypatch.setenv('CLOUDINARY_CLOUD_NAME', 'drifted-cloud')
+    monkeypatch.setenv('CLOUDINARY_API_KEY', 'drifted-key')
+    try:
+        config = cloudinary_helper._sdk().config()
+        assert (config.cloud_name, config.api_key, config.api_secret) == \
+            ('resolved-cloud', 'resolved-key', 'resolved-secret')
+    finally:
+        monkeypatch.delenv('CLOUDINARY_CLOUD_NAME')
+        cloudinary_helper.reload_storage_backend()
@@ -0,0 +1,99 @@
+"""Content history keyframe/delta storage (content_history)"""
+
+import json
+from types import SimpleNamespace
+import pytest
+import content_history
+from content_history import (KEYFRAME_INTERVAL, SNAPSHOT_FIELDS, compact, create_snapshot, decode,
+                             delete_entry, load_snapshot)
+from models import db, ContentHistory
+
+
+def state(version):
+    """A distinct content state per version; only some fields change each time"""
+    values = {field: f'{field} v0' for field in SNAPSHOT_FIELDS}
+    values['hero_title'] = f'Title v{version}'
+    if version % 3 == 0:
+        values['footer_text'] = f'Footer v{version}'
+    return values
+
+
+def record(count):
+    """Snapshot `count` versions; returns [(entry id, expected state)]"""
+    recorded = []
+    for version in range(count):
+        values = state(version)
+        entry = create_snapshot(SimpleNamespace(**values), f'Version {version}')
+        recorded.append((entry.id, values))
+    db.session.commit()
+    return recorded
+
+
+def assert_all_load(recorded):
+    for entry_id, expected in recorded:
+        assert load_snapshot(db.session.get(ContentHistory, entry_id)) == expected
+
+
+@pytest.fixture
+def history(app):
+    with app.app_context():
+        ContentHistory.query.delete()
+        db.session.commit()
+        yield
+
+
+def test_every_entry_reconstructs_across_keyframe_intervals(history):
+    recorded = record(3 * KEYFRAME_INTERVAL + 2)
+    kinds = [decode(db.session.get(ContentHistory, entry_id))[0] for entry_id, _ in recorded]
+    assert kinds.count('keyframe') == 4
+    assert kinds[0] == kinds[KEYFRAME_INTERVAL] == 'keyframe'
+    assert_all_load(recorded)
+
+
+def test_deleting_a_delta_keeps_the_chain_intact(history):
+    recorded = record(KEYFRAME_INTERVAL)
+    middle = recorded.pop(KEYFRAME_INTERVAL // 2)
+    delete_entry(db.session.get(ContentHistory, middle[0]))
+    db.session.commit()
+    # The entry after the deleted one no longer depends on it
+    assert decode(db.session.get(ContentHistory, recorded[KEYFRAME_INTERVAL // 2][0]))[0] == 'keyframe'
+    assert_all_load(recorded)
+
+
+def test_deleting_a_keyframe_keeps_the_chain_intact(history):
+    recorded = record(KEYFRAME_INTERVAL + 3)
+    keyframe = recorded.pop(KEYFRAME_INTERVAL)
+    assert decode(db.session.get(ContentHistory, keyframe[0]))[0] == 'keyframe'
+    delete_entry(db.session.get(ContentHistory, keyframe[0]))
+    db.session.commit()
+    assert_all_load(recorded)
+
+
+def test_compact_keeps_the_newest_entries_loadable(history):
+    recorded = record(KEYFRAME_INTERVAL + 5)
+    keep = KEYFRAME_INTERVAL - 2
+    assert compact(max_entries=keep) == len(recorded) - keep
+    db.session.commit()
+    recorded = recorded[-keep:]
+    assert ContentHistory.query.count() == keep
+    # The oldest survivor was a delta; it is rewritten as a keyframe
+    assert decode(db.session.get(ContentHistory, recorded[0][0]))[0] == 'keyframe'
+    assert_all_load(recorded)
+
+
+def test_create_snapshot_compacts_past_max_entries(history, monkeypatch):
+    monkeypatch.setattr(content_history, 'compact',
+                        lambda: compact(max_entries=KEYFRAME_INTERVAL + 1))
+    recorded = record(2 * KEYFRAME_INTERVAL)
+    assert ContentHistory.query.count() == KEYFRAME_INTERVAL + 1
+    assert_all_load(recorded[-(KEYFRAME_INTERVAL + 1):])
+
+
+def test_legacy_full_snapshots_load_and_anchor_new_deltas(history):
+    legacy = state(0)
+    entry = ContentHistory(content_snapshot=json.dumps(legacy), description='Before keyframes')
+    db.session.add(entry)
+    db.session.commit()
+    recorded = [(entry.id, legacy)] + record(3)[1:]
+    assert decode(db.session.get(ContentHistory, recorded[1][0]))[0] == 'delta'
+    assert_all_load(recorded)
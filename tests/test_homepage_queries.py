@@ -0,0 +1,55 @@
+"""The homepage issues the same number of statements however large the catalog is"""
+
+from sqlalchemy import event
+from models import db, Product, ProductImage
+
+GALLERY_SIZE = 4
+
+
+def set_catalog(app, count):
+    """Replace the products with count products of GALLERY_SIZE gallery images each"""
+    with app.app_context():
+        ProductImage.query.delete()
+        Product.query.delete()
+        for i in range(count):
+            product = Product(icon='⚡', title=f'Product {i}', description='Test product',
+                              image=f'product-{i}.jpg', order=i)
+            db.session.add(product)
+            db.session.flush()
+            # Inserted out of order: the gallery order must come from SQL
+            for order in reversed(range(GALLERY_SIZE)):
+                db.session.add(ProductImage(product_id=product.id, image_url=f'gallery-{i}-{order}.jpg',
+                                            order=order))
+        db.session.commit()
+
+
+def homepage_statements(app, client):
+    """SQL statements emitted while rendering /"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get('/')
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 200
+    return statements, response.get_data(as_text=True)
+
+
+def test_homepage_statement_count_does_not_grow_with_catalog(app, client):
+    set_catalog(app, 5)
+    few, _ = homepage_statements(app, client)
+
+    set_catalog(app, 15)
+    many, html = homepage_statements(app, client)
+
+    assert len(few) == len(many), many
+    # Every product and gallery image was actually rendered
+    assert html.count('Product ') >= 15
+    assert 'gallery-14-3.jpg' in html
@@ -0,0 +1,38 @@
+"""Responsive derivatives (image_pipeline)"""
+
+import os
+import pytest
+from image_pipeline import derivative_paths, generate_derivatives, responsive_image
+
+Image = pytest.importorskip('PIL.Image')
+
+
+@pytest.fixture
+def products_dir(tmp_path, monkeypatch):
+    # responsive_image resolves files relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / 'static' / 'images' / 'products'
+    path.mkdir(parents=True)
+    return path
+
+
+def test_animated_gif_gets_no_still_derivatives(products_dir):
+    path = str(products_dir / 'anim.gif')
+    frames = [Image.new('RGB', (800, 600), color) for color in ('red', 'blue')]
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=100, loop=0)
+
+    assert generate_derivatives(path) == 0
+    assert not any(os.path.exists(p) for p in derivative_paths(path))
+
+
+def test_original_is_largest_srcset_candidate(app, products_dir):
+    Image.new('RGB', (800, 600), 'green').save(products_dir / 'photo.jpg')
+    assert generate_derivatives(str(products_dir / 'photo.jpg')) > 0
+
+    with app.test_request_context():
+        image = responsive_image('photo.jpg', 'products')
+
+    for srcset in (image['srcset'], image['webp_srcset']):
+        candidates = [entry.rsplit(' ', 1) for entry in srcset.split(', ')]
+        assert [width for _, width in candidates] == ['320w', '640w', '800w']
+        assert candidates[-1][0] == image['src']
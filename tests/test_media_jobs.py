@@ -0,0 +1,44 @@
+"""Media job queue (media_jobs)"""
+
+from datetime import datetime, timedelta
+import media_jobs
+from media_jobs import enqueue, heartbeat, requeue_stale_jobs, run_next_job
+from models import db, MediaJob
+
+
+def test_heartbeat_keeps_a_long_job_from_being_requeued(app, monkeypatch):
+    seen = {}
+
+    def slow_handler(payload):
+        job = db.session.get(MediaJob, seen['id'])
+        # The job has been running longer than the stale timeout...
+        job.updated_at = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+        # ...but reports that it is still alive
+        heartbeat()
+        seen['requeued'] = requeue_stale_jobs(timeout=timedelta(minutes=30))
+        return False
+
+    monkeypatch.setitem(media_jobs.HANDLERS, 'slow', slow_handler)
+    with app.app_context():
+        seen['id'] = enqueue('slow').id
+        db.session.commit()
+        assert run_next_job() is True
+        assert seen['requeued'] == 0
+        assert db.session.get(MediaJob, seen['id']).status == 'done'
+
+
+def test_worker_survives_a_database_error(app, monkeypatch):
+    calls = []
+
+    def flaky_run_next_job(on_change=None):
+        calls.append(on_change)
+        if len(calls) == 1:
+            raise RuntimeError('connection lost')
+        return False
+
+    monkeypatch.setattr(media_jobs, 'run_next_job', flaky_run_next_job)
+    with app.app_context():
+        media_jobs.run_worker(poll_interval=0, once=True)
+    # The error counted as an idle poll; once=True stopped after it
+    assert len(calls) == 1
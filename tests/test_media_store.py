@@ -0,0 +1,42 @@
+"""Reference-counted release of content-addressed media (media_store)"""
+
+import io
+import os
+import time
+import pytest
+from werkzeug.datastructures import FileStorage
+import media_store
+from media_store import release, store_upload
+
+
+@pytest.fixture
+def store(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(media_store.FOLDERS, 'products', str(tmp_path / 'products'))
+    with app.app_context():
+        yield
+
+
+def upload(data):
+    return store_upload(FileStorage(io.BytesIO(data), filename='photo.jpg'), 'products')
+
+
+def test_release_deletes_old_unreferenced_file(store):
+    filename = upload(b'old photo')
+    path = media_store.folder_path('products', filename)
+    past = time.time() - media_store.RELEASE_GRACE_SECONDS - 60
+    os.utime(path, (past, past))
+
+    assert release('products', filename) is True
+    assert not os.path.exists(path)
+
+
+def test_release_keeps_file_a_pending_upload_deduped_onto(store):
+    filename = upload(b'same photo')
+    path = media_store.folder_path('products', filename)
+    past = time.time() - media_store.RELEASE_GRACE_SECONDS - 60
+    os.utime(path, (past, past))
+
+    # Another request stores the same bytes but has not committed yet
+    assert upload(b'same photo') == filename
+    assert release('products', filename) is False
+    assert os.path.exists(path)
@@ -0,0 +1,66 @@
+"""Range and conditional requests for locally stored hero videos (media_video)"""
+
+import os
+import pytest
+
+SIZE = 64 * 1024
+
+
+@pytest.fixture
+def video(app, tmp_path):
+    """A random fixture file in a temp static/videos folder"""
+    static_folder = tmp_path / 'static'
+    (static_folder / 'videos').mkdir(parents=True)
+    data = os.urandom(SIZE)
+    (static_folder / 'videos' / 'clip.mp4').write_bytes(data)
+    app.static_folder = str(static_folder)
+    return '/media/videos/clip.mp4', data
+
+
+def get(client, url, **headers):
+    response = client.get(url, headers=headers)
+    body = response.get_data()
+    response.close()
+    return response, body
+
+
+def test_full_response_advertises_ranges(client, video):
+    url, data = video
+    response, body = get(client, url)
+    assert response.status_code == 200
+    assert body == data
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.mimetype == 'video/mp4'
+
+
+@pytest.mark.parametrize('header, start, end', [
+    ('bytes=0-99', 0, 99),
+    ('bytes=1000-4095', 1000, 4095),
+    ('bytes=65000-', 65000, SIZE - 1),
+    ('bytes=-500', SIZE - 500, SIZE - 1),
+    ('bytes=60000-99999', 60000, SIZE - 1),
+])
+def test_byte_ranges(client, video, header, start, end):
+    url, data = video
+    response, body = get(client, url, Range=header)
+    assert response.status_code == 206
+    assert body == data[start:end + 1]
+    assert response.headers['Content-Range'] == f'bytes {start}-{end}/{SIZE}'
+    assert int(response.headers['Content-Length']) == end - start + 1
+
+
+def test_unsatisfiable_range(client, video):
+    url, _ = video
+    response, _ = get(client, url, Range=f'bytes={SIZE}-{SIZE + 100}')
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{SIZE}'
+
+
+def test_if_none_match_returns_304(client, video):
+    url, _ = video
+    response, _ = get(client, url)
+    etag = response.headers['ETag']
+
+    response, body = get(client, url, **{'If-None-Match': etag})
+    assert response.status_code == 304
+    assert body == b''
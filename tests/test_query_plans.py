@@ -0,0 +1,14 @@
+"""The ordering queries behind every page view use their indexes (see query_plans)"""
+
+from migrations import upgrade
+from query_plans import check_indexes
+
+
+def test_migrated_schema_serves_ordering_queries_from_indexes(make_app):
+    app = make_app()
+    with app.app_context():
+        upgrade()
+        results = check_indexes()
+
+    unused = [(description, index, plan) for description, index, used, plan in results if not used]
+    assert results and all(used for _, _, used, _ in results), unused
@@ -0,0 +1,12 @@
+"""Requests over MAX_CONTENT_LENGTH go back to a page the worker serves"""
+
+from app import bootstrap_database
+
+
+def test_public_worker_redirects_oversized_post_to_contact(make_app):
+    app = make_app('public')
+    with app.app_context():
+        bootstrap_database()
+    response = app.test_client().post('/contact', data={'message': 'x' * (2 * 1024 * 1024)})
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/#contact')
@@ -0,0 +1,41 @@
+"""Hero video transcoding (video_pipeline) with a stand-in ffmpeg"""
+
+import os
+import pytest
+import video_pipeline
+
+FAKE_FFMPEG = '''#!/bin/sh
+for last; do :; done
+sleep 0.3
+echo "$last" > "$last"
+'''
+
+
+@pytest.fixture
+def ffmpeg(tmp_path, monkeypatch):
+    script = tmp_path / 'ffmpeg'
+    script.write_text(FAKE_FFMPEG)
+    script.chmod(0o755)
+    monkeypatch.setattr(video_pipeline, 'FFMPEG', str(script))
+    monkeypatch.setattr(video_pipeline, 'HAS_FFMPEG', True)
+    monkeypatch.setattr(video_pipeline, 'HEARTBEAT_SECONDS', 0.1)
+
+
+def test_transcode_heartbeats_and_uses_unique_temp_files(tmp_path, ffmpeg):
+    original = tmp_path / 'videos' / 'hero.mov'
+    original.parent.mkdir()
+    original.write_bytes(b'video')
+    beats = []
+
+    assert video_pipeline.transcode(str(original), heartbeat=lambda: beats.append(1)) == 3
+    assert beats
+
+    temp_names = set()
+    for path in video_pipeline.variant_paths(str(original)):
+        # The stand-in writes its output path into the temp file it was given
+        temp_name = os.path.basename(open(path).read().strip())
+        assert temp_name.startswith(f'.{os.path.basename(path)}.') and temp_name.endswith('.part')
+        temp_names.add(temp_name)
+    assert len(temp_names) == 3
+    assert sorted(os.listdir(original.parent / 'derived')) == sorted(
+        os.path.basename(p) for p in video_pipeline.variant_paths(str(original)))
@@ -0,0 +1,199 @@
+"""
+Video Pipeline
+Transcodes locally stored hero videos with ffmpeg into web-optimized
+variants and a poster frame, and builds the <source>/poster data for the
+hero template. Variants live next to the originals in a 'derived' subfolder:
+    static/videos/derived/<stem>-web.mp4     H.264, faststart
+    static/videos/derived/<stem>-web.webm    VP9
+    static/videos/derived/<stem>-poster.jpg  first frame
+ffmpeg is optional; without it the original is served as uploaded.
+Cloudinary videos get the same variants through URL transformations.
+"""
+
+import os
+import shutil
+import subprocess
+import time
+import uuid
+from flask import url_for
+
+FFMPEG = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
+HAS_FFMPEG = shutil.which(FFMPEG) is not None
+
+# Upper bound for one ffmpeg run (the worker moves on to the next job after it)
+TRANSCODE_TIMEOUT = int(os.environ.get('VIDEO_TRANSCODE_TIMEOUT', 1800))
+HEARTBEAT_SECONDS = 60
+
+DERIVED_DIR = 'derived'
+
+# The hero is a full-width background: never wider than this
+MAX_WIDTH = 1920
+SCALE = f"scale='min({MAX_WIDTH},iw)':-2"
+
+# suffix -> (ffmpeg output arguments, MIME type); the hero is muted, so no audio.
+# Listed in the order browsers should try them.
+VARIANTS = {
+    'web.webm': (['-c:v', 'libvpx-vp9', '-crf', '36', '-b:v', '0', '-row-mt', '1',
+                  '-vf', SCALE, '-an', '-f', 'webm'], 'video/webm'),
+    'web.mp4': (['-c:v', 'libx264', '-preset', 'slow', '-crf', '26', '-pix_fmt', 'yuv420p',
+                 '-vf', SCALE, '-an', '-movflags', '+faststart', '-f', 'mp4'], 'video/mp4'),
+}
+POSTER = 'poster.jpg'
+POSTER_ARGS = ['-frames:v', '1', '-vf', SCALE, '-q:v', '4', '-f', 'image2', '-c:v', 'mjpeg']
+
+# Type attribute for the original, by extension
+VIDEO_MIMETYPES = {
+    'mp4': 'video/mp4',
+    'webm': 'video/webm',
+    'mov': 'video/quicktime',
+    'avi': 'video/x-msvideo',
+    'mkv': 'video/x-matroska',
+}
+
+
+def variant_path(original_path, suffix):
+    directory, filename = os.path.split(original_path)
+    stem = filename.rsplit('.', 1)[0]
+    return os.path.join(directory, DERIVED_DIR, f"{stem}-{suffix}")
+
+
+def variant_paths(original_path):
+    """Every variant path that may exist for an original"""
+    return [variant_path(original_path, suffix) for suffix in list(VARIANTS) + [POSTER]]
+
+
+def run_ffmpeg(original_path, args, path, heartbeat=None):
+    """Write one output through a temp file, so a killed run never leaves a truncated variant"""
+    # Unique per run: a requeued job may overlap with a run that is still going
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex}.part")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        process = subprocess.Popen([FFMPEG, '-hide_banner', '-loglevel', 'error', '-y', '-i', original_path]
+                                   + args + [tmp_path],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        deadline = time.monotonic() + TRANSCODE_TIMEOUT
+        while True:
+            try:
+                _, stderr = process.communicate(timeout=HEARTBEAT_SECONDS)
+                break
+            except subprocess.TimeoutExpired:
+                if time.monotonic() > deadline:
+                    process.kill()
+                    process.communicate()
+                    raise
+                if heartbeat:
+                    heartbeat()
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, FFMPEG, stderr=stderr)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def transcode(original_path, heartbeat=None):
+    """
+    Create the web variants and poster for one video
+
+    Existing outputs are left alone, so this is safe to re-run.
+
+    Args:
+        original_path: stored video
+        heartbeat: called about every HEARTBEAT_SECONDS while ffmpeg runs,
+            so the job queue knows a long transcode is still alive
+
+    Returns:
+        int: number of files written
+    """
+    if not HAS_FFMPEG or not os.path.exists(original_path):
+        return 0
+
+    written = 0
+    # Poster first: it is what the page shows until the video starts
+    outputs = [(POSTER, POSTER_ARGS)] + [(suffix, args) for suffix, (args, _) in VARIANTS.items()]
+    for suffix, args in outputs:
+        path = variant_path(original_path, suffix)
+        if os.path.exists(path):
+            continue
+        try:
+            run_ffmpeg(original_path, args, path, heartbeat)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"ffmpeg failed for {path}: {e.stderr.decode(errors='replace').strip()}")
+        written += 1
+    return written
+
+
+def remove_video(original_path):
+    """Delete a local video together with its variants"""
+    for path in [original_path] + variant_paths(original_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def cloudinary_variant(url, transformation, ext):
+    """Cloudinary video URL transcoded on the fly into another format"""
+    if '/upload/' not in url:
+        return url
+    url = url.replace('/upload/', f'/upload/{transformation}/', 1)
+    return f"{url.rsplit('.', 1)[0]}.{ext}"
+
+
+def hero_video(value):
+    """
+    Template helper: <source> list and poster for the hero video
+
+    Args:
+        value: Cloudinary URL or local filename from the database
+
+    Returns:
+        dict with 'sources' (list of (src, type), best first) and 'poster'
+        (empty when there is none)
+    """
+    if value.startswith('http'):
+        if '/upload/' not in value:
+            return {'sources': [(value, None)], 'poster': ''}
+        return {
+            'sources': [(cloudinary_variant(value, f'c_limit,w_{MAX_WIDTH},q_auto', 'webm'), 'video/webm'),
+                        (cloudinary_variant(value, f'c_limit,w_{MAX_WIDTH},q_auto', 'mp4'), 'video/mp4')],
+            'poster': cloudinary_variant(value, f'c_limit,w_{MAX_WIDTH},so_0', 'jpg'),
+        }
+
+    original_path = os.path.join('static', 'videos', value)
+
+    def local_url(path):
+        relative = os.path.relpath(path, os.path.join('static', 'videos')).replace(os.sep, '/')
+        return url_for('media_video', filename=relative)
+
+    sources = [(local_url(variant_path(original_path, suffix)), mimetype)
+               for suffix, (_, mimetype) in VARIANTS.items()
+               if os.path.exists(variant_path(original_path, suffix))]
+    # The original stays as the last fallback, with its real type so
+    # browsers skip containers they cannot play
+    ext = value.rsplit('.', 1)[-1].lower() if '.' in value else ''
+    sources.append((url_for('media_video', filename=value), VIDEO_MIMETYPES.get(ext)))
+
+    poster_path = variant_path(original_path, POSTER)
+    return {'sources': sources, 'poster': local_url(poster_path) if os.path.exists(poster_path) else ''}
+
+
+def backfill():
+    """
+    Transcode every stored video that is missing variants
+
+    Returns:
+        tuple: (videos scanned, files written)
+    """
+    scanned = written = 0
+    directory = os.path.join('static', 'videos')
+    if not os.path.isdir(directory):
+        return scanned, written
+    for filename in sorted(os.listdir(directory)):
+        path = os.path.join(directory, filename)
+        if not os.path.isfile(path):
+            continue
+        scanned += 1
+        try:
+            written += transcode(path)
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"[VIDEOS] Skipping {path}: {e}")
+    return scanned, written